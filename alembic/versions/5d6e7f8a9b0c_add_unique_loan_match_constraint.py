@@ -0,0 +1,43 @@
+"""add unique loan match constraint
+
+Revision ID: 5d6e7f8a9b0c
+Revises: 4c5d6e7f8g9h
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d6e7f8a9b0c'
+down_revision: Union[str, None] = '4c5d6e7f8g9h'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicate matches left by earlier workflow retries, keeping the oldest
+    op.execute(
+        """
+        DELETE FROM loan_matches a
+        USING loan_matches b
+        WHERE a.loan_application_id = b.loan_application_id
+          AND a.lender_id = b.lender_id
+          AND a.id > b.id
+        """
+    )
+    
+    # Create unique constraint for one match per application and lender
+    op.create_unique_constraint(
+        'uq_loan_matches_application_lender',
+        'loan_matches',
+        ['loan_application_id', 'lender_id']
+    )
+
+
+def downgrade() -> None:
+    # Drop unique constraint
+    op.drop_constraint('uq_loan_matches_application_lender', 'loan_matches', type_='unique')
@@ -2,6 +2,7 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.middleware import etag_middleware
 from app.routers import lender_routes, loan_application_routes
 
 # Configure logging
@@ -18,6 +19,11 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Let polling clients revalidate unchanged GET responses with 304s. Starlette
+# wraps later middleware around earlier ones, so this is registered before CORS
+# to keep its 304s inside CORSMiddleware and give them the CORS headers too.
+app.middleware("http")(etag_middleware)
+
 # Configure CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,68 @@
+"""
+HTTP Middleware Module
+
+Conditional GET support for JSON API responses.
+"""
+import hashlib
+from fastapi import Request, Response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against a response ETag.
+
+    The header is a comma-separated list of entity tags, or "*" for any
+    representation. If-None-Match uses weak comparison, so a "W/" prefix on
+    either side is ignored.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: ETag of the current response
+
+    Returns:
+        bool: True if the client's cached copy is still current
+    """
+    def opaque_tag(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    tags = [tag.strip() for tag in if_none_match.split(",") if tag.strip()]
+    return "*" in tags or opaque_tag(etag) in {opaque_tag(tag) for tag in tags}
+
+
+async def etag_middleware(request: Request, call_next) -> Response:
+    """
+    Add an ETag to successful JSON GET responses and answer repeats with 304.
+
+    The frontend polls list and detail endpoints while documents are being
+    processed. With an ETag and "Cache-Control: no-cache" the browser
+    revalidates each poll with If-None-Match, so unchanged results cost a
+    bodyless 304 instead of the full JSON payload.
+
+    Args:
+        request: Incoming request
+        call_next: Next handler in the middleware chain
+
+    Returns:
+        Response: The original response with an ETag, or a 304 response
+    """
+    response = await call_next(request)
+
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not response.headers.get("content-type", "").startswith("application/json")
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    conditional_response = Response(content=body, status_code=response.status_code)
+    conditional_response.raw_headers = list(response.raw_headers)
+    conditional_response.headers["ETag"] = etag
+    conditional_response.headers["Cache-Control"] = "no-cache"
+    return conditional_response
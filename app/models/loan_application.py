@@ -6,7 +6,7 @@ and LoanMatch model for storing match results with lenders.
 """
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models import Base
@@ -131,6 +131,10 @@ class LoanMatch(Base):
     - Processing status
     """
     __tablename__ = "loan_matches"
+    __table_args__ = (
+        # One match per application and lender, so workflow retries cannot create duplicates
+        UniqueConstraint("loan_application_id", "lender_id", name="uq_loan_matches_application_lender"),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -244,10 +244,7 @@ async def get_lender(
     logger.info(f"Fetching Lender ID: {lender_id}")
     
     try:
-        result = await db.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one_or_none()
+        lender = await db.get(Lender, lender_id)
         
         if not lender:
             logger.warning(f"Lender ID {lender_id} not found")
@@ -380,10 +377,7 @@ async def delete_lender(
     logger.info(f"Deleting Lender ID: {lender_id}")
     
     try:
-        result = await db.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one_or_none()
+        lender = await db.get(Lender, lender_id)
         
         if not lender:
             logger.warning(f"Lender ID {lender_id} not found for deletion")
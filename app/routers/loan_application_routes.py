@@ -3,9 +3,12 @@ Loan Application API Routes
 
 API endpoints for loan application management and processing.
 """
+import asyncio
 import logging
+import os
 from typing import List, Optional
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, status
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -14,7 +17,6 @@ from datetime import datetime
 
 from app.models.loan_application import LoanApplication, LoanMatch, ApplicationStatus, MatchStatus
 from app.services.ocr_service import OCRService
-from app.services.llm_service import LLMService
 from app.models.lender import Lender
 try:
     from app.workflows.hatchet_config import hatchet_client as hatchet_client_instance
@@ -34,7 +36,16 @@ router = APIRouter(prefix="/api/loan-applications", tags=["loan-applications"])
 
 # Initialize services
 ocr_service = OCRService()
-llm_service = LLMService()
+
+# How often the status event stream re-reads an application's status. The same
+# backoff as the frontend's list polling: the delay starts at the base, grows
+# while the status is unchanged, and resets whenever it changes.
+STATUS_EVENT_BASE_DELAY = float(os.getenv("STATUS_EVENT_BASE_DELAY", "2"))
+STATUS_EVENT_MAX_DELAY = float(os.getenv("STATUS_EVENT_MAX_DELAY", "15"))
+STATUS_EVENT_BACKOFF = 1.5
+
+# Statuses after which an application no longer changes
+TERMINAL_APPLICATION_STATUSES = {ApplicationStatus.COMPLETED, ApplicationStatus.FAILED}
 
 
 # Pydantic models for request/response
@@ -88,6 +99,13 @@ class UploadApplicationResponse(BaseModel):
     workflow_run_id: Optional[str] = None
 
 
+class ApplicationStatusResponse(BaseModel):
+    """Response model for loan application processing status"""
+    application_id: int
+    status: str
+    updated_at: datetime
+
+
 # Dependency to get database session
 async def get_db():
     """Database session dependency"""
@@ -296,11 +314,17 @@ async def get_loan_application(
         }
         
         if include_matches and application.matches:
+            # Look up all lender names in one query instead of one per match
+            lender_names = dict((await db.execute(
+                select(Lender.id, Lender.lender_name)
+                .where(Lender.id.in_({match.lender_id for match in application.matches}))
+            )).all())
+            
             response_data["matches"] = [
                 {
                     "id": match.id,
                     "lender_id": match.lender_id,
-                    "lender_name": (await db.execute(select(Lender).where(Lender.id == match.lender_id))).scalar_one_or_none().lender_name,
+                    "lender_name": lender_names.get(match.lender_id),
                     "match_score": match.match_score,
                     "match_analysis": match.match_analysis,
                     "status": match.status.value,
@@ -408,6 +432,129 @@ async def list_loan_applications(
         )
 
 
+@router.get(
+    "/{application_id}/status",
+    response_model=ApplicationStatusResponse,
+    summary="Get Loan Application Status",
+    description="Retrieve only the processing status of a loan application, for polling"
+)
+async def get_loan_application_status(
+    application_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the processing status of a loan application.
+    
+    Args:
+        application_id: ID of the loan application
+        db: Database session (injected)
+    
+    Returns:
+        ApplicationStatusResponse with the current status
+    """
+    try:
+        row = (await db.execute(
+            select(LoanApplication.status, LoanApplication.updated_at)
+            .where(LoanApplication.id == application_id)
+        )).one_or_none()
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Loan Application with ID {application_id} not found"
+            )
+        
+        return ApplicationStatusResponse(
+            application_id=application_id,
+            status=row.status.value,
+            updated_at=row.updated_at
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch loan application status: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch loan application status: {str(e)}"
+        )
+
+
+@router.get(
+    "/{application_id}/events",
+    response_class=StreamingResponse,
+    summary="Stream Loan Application Status",
+    description="Stream status changes of a loan application as server-sent events"
+)
+async def stream_loan_application_status(
+    application_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream the processing status of a loan application as server-sent events.
+    
+    One event is sent with the current status and another on every change,
+    and the stream ends once the application is completed or failed. The
+    status is re-read server side with the same backoff as the frontend's
+    list polling, so a client waiting for processing holds one request open
+    instead of polling the status endpoint.
+    
+    Args:
+        application_id: ID of the loan application
+        request: Incoming request, used to stop when the client disconnects
+        db: Database session (injected)
+    
+    Returns:
+        StreamingResponse of ApplicationStatusResponse events
+    """
+    async def read_status():
+        row = (await db.execute(
+            select(LoanApplication.status, LoanApplication.updated_at)
+            .where(LoanApplication.id == application_id)
+        )).one_or_none()
+        # End the read transaction so no connection is held between reads
+        await db.commit()
+        return row
+    
+    row = await read_status()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Loan Application with ID {application_id} not found"
+        )
+    
+    async def status_events():
+        current = row
+        last_status = None
+        delay = STATUS_EVENT_BASE_DELAY
+        # A deleted application ends the stream
+        while current:
+            if current.status != last_status:
+                last_status = current.status
+                delay = STATUS_EVENT_BASE_DELAY
+                event = ApplicationStatusResponse(
+                    application_id=application_id,
+                    status=current.status.value,
+                    updated_at=current.updated_at
+                )
+                yield f"data: {event.model_dump_json()}\n\n"
+            
+            if current.status in TERMINAL_APPLICATION_STATUSES or await request.is_disconnected():
+                break
+            
+            await asyncio.sleep(delay)
+            delay = min(STATUS_EVENT_MAX_DELAY, delay * STATUS_EVENT_BACKOFF)
+            current = await read_status()
+    
+    return StreamingResponse(
+        status_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 @router.get(
     "/{application_id}/matches",
     response_model=List[LoanMatchResponse],
@@ -436,10 +583,7 @@ async def get_application_matches(
     
     try:
         # Verify application exists
-        app_result = await db.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = app_result.scalar_one_or_none()
+        application = await db.get(LoanApplication, application_id)
         
         if not application:
             raise HTTPException(
@@ -518,10 +662,7 @@ async def delete_loan_application(
     logger.info(f"Deleting Loan Application ID: {application_id}")
     
     try:
-        result = await db.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
+        application = await db.get(LoanApplication, application_id)
         
         if not application:
             logger.warning(f"Loan Application ID {application_id} not found for deletion")
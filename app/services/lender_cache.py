@@ -0,0 +1,85 @@
+"""
+Lender Cache Module
+
+In-process cache of the active (completed) lender list used for matching.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ActiveLenderCache:
+    """
+    Time-based cache for the list of active lenders.
+
+    The lender set changes far less often than applications arrive, so the
+    matching workflow reuses one lookup for up to `ttl_seconds`. The lender
+    processing workflow invalidates the cache whenever a lender's status
+    changes, so new lenders are picked up immediately within the worker.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        """
+        Initialize Active Lender Cache
+
+        Args:
+            ttl_seconds: How long a loaded lender list stays valid (default: 60)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lenders: Optional[List[Dict[str, Any]]] = None
+        self._lenders_by_id: Dict[int, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, loader: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Return the cached lender list, loading it on a miss.
+
+        Args:
+            loader: Coroutine function that fetches the active lenders
+
+        Returns:
+            List of lender dictionaries
+        """
+        async with self._lock:
+            if self._lenders is None or time.monotonic() >= self._expires_at:
+                logger.debug("Active lender cache miss, loading lenders")
+                self._lenders = await loader()
+                self._lenders_by_id = {lender["id"]: lender for lender in self._lenders}
+                self._expires_at = time.monotonic() + self.ttl_seconds
+            return self._lenders
+
+    async def get_by_id(
+        self,
+        loader: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Return the cached lenders keyed by id, loading them on a miss.
+
+        Lets match calculation reuse the already-decoded processed_data
+        instead of reading the JSON column again for every application.
+
+        Args:
+            loader: Coroutine function that fetches the active lenders
+
+        Returns:
+            Dictionary mapping lender id to lender dictionary
+        """
+        await self.get(loader)
+        return self._lenders_by_id
+
+    def invalidate(self) -> None:
+        """Drop the cached lender list so the next lookup reloads it."""
+        self._lenders = None
+        self._lenders_by_id = {}
+
+
+# Shared by the lender processing and loan matching workflows in a worker
+active_lender_cache = ActiveLenderCache(
+    ttl_seconds=float(os.getenv("ACTIVE_LENDER_CACHE_TTL", "60"))
+)
@@ -405,3 +405,7 @@ Example output format:
             logger.error(f"LLM processing failed: {str(e)}", exc_info=True)
             raise RuntimeError(f"LLM processing failed: {str(e)}") from e
 
+
+# Shared by the lender processing and loan matching workflows, so a worker keeps
+# a single OpenAI client and connection pool
+llm_service = LLMService()
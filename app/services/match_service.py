@@ -3,6 +3,7 @@ Match Service Module
 
 Handles calculation of match scores between loan applications and lenders using LLM.
 """
+import asyncio
 import logging
 import json
 from typing import Dict, Any, Optional
@@ -12,6 +13,27 @@ import os
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Criteria and score scale shared by the single and batched match prompts, so
+# both ways of scoring a lender grade it the same way
+_MATCH_SCORING_GUIDE = """1. **Loan Amount**: Does the requested amount fall within the lender's range?
+2. **Loan Type**: Does the lender offer the type of loan requested?
+3. **Interest Rate**: Are the applicant's expectations aligned with the lender's rates?
+4. **Eligibility Criteria**: Does the applicant meet the lender's requirements?
+5. **Tenure**: Is the requested loan tenure available?
+6. **Credit Profile**: Does the applicant's credit profile match the lender's criteria?
+7. **Income Requirements**: Does the applicant meet income requirements?
+8. **Documentation**: Can the applicant provide required documents?
+9. **Special Conditions**: Are there any special conditions that affect the match?
+10. **Overall Fit**: General compatibility between application and lender policy
+
+Calculate a match score from 0-100 where:
+- 90-100: Excellent match, highly recommended
+- 75-89: Very good match, recommended
+- 60-74: Good match, suitable
+- 40-59: Fair match, possible with conditions
+- 20-39: Poor match, significant gaps
+- 0-19: Very poor match, not recommended"""
+
 
 class MatchService:
     """
@@ -25,7 +47,8 @@ class MatchService:
         self,
         api_key: Optional[str] = None,
         model: str = "gpt-4o-mini",
-        temperature: float = 0.2
+        temperature: float = 0.2,
+        prefilter_loan_type: Optional[bool] = None
     ):
         """
         Initialize Match Service
@@ -34,6 +57,8 @@ class MatchService:
             api_key: OpenAI API key. If None, reads from OPENAI_API_KEY env var
             model: OpenAI model to use (default: gpt-4o-mini)
             temperature: Temperature for generation (default: 0.2 for more deterministic output)
+            prefilter_loan_type: Skip the LLM for lenders that do not offer the requested
+                loan type. If None, reads from MATCH_PREFILTER_LOAN_TYPE env var (default: off)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -42,6 +67,9 @@ class MatchService:
         self.client = AsyncOpenAI(api_key=self.api_key) if self.api_key else None
         self.model = model
         self.temperature = temperature
+        if prefilter_loan_type is None:
+            prefilter_loan_type = os.getenv("MATCH_PREFILTER_LOAN_TYPE", "false").lower() == "true"
+        self.prefilter_loan_type = prefilter_loan_type
         
         logger.info(f"Match Service initialized with model: {model}")
     
@@ -73,24 +101,7 @@ Loan Application Data:
 {json.dumps(application_data, indent=2)}
 
 Please analyze the match between this loan application and the lender's policy, considering:
-1. **Loan Amount**: Does the requested amount fall within the lender's range?
-2. **Loan Type**: Does the lender offer the type of loan requested?
-3. **Interest Rate**: Are the applicant's expectations aligned with the lender's rates?
-4. **Eligibility Criteria**: Does the applicant meet the lender's requirements?
-5. **Tenure**: Is the requested loan tenure available?
-6. **Credit Profile**: Does the applicant's credit profile match the lender's criteria?
-7. **Income Requirements**: Does the applicant meet income requirements?
-8. **Documentation**: Can the applicant provide required documents?
-9. **Special Conditions**: Are there any special conditions that affect the match?
-10. **Overall Fit**: General compatibility between application and lender policy
-
-Calculate a match score from 0-100 where:
-- 90-100: Excellent match, highly recommended
-- 75-89: Very good match, recommended
-- 60-74: Good match, suitable
-- 40-59: Fair match, possible with conditions
-- 20-39: Poor match, significant gaps
-- 0-19: Very poor match, not recommended
+{_MATCH_SCORING_GUIDE}
 
 Return ONLY a valid JSON object with the following structure:
 {{
@@ -115,6 +126,68 @@ Return ONLY a valid JSON object with the following structure:
 }}
 
 Be objective and thorough in your analysis. Consider both positive and negative aspects.
+"""
+        return prompt
+    
+    def _build_batch_match_prompt(
+        self,
+        application_data: Dict[str, Any],
+        lenders: list[Dict[str, Any]]
+    ) -> str:
+        """
+        Build the prompt for scoring one application against several lenders.
+        
+        Args:
+            application_data: Processed loan application data
+            lenders: List of lender dictionaries with 'id', 'name', and 'data' keys
+        
+        Returns:
+            str: Formatted prompt for the LLM
+        """
+        lender_sections = "\n\n".join(
+            f"Lender ID {lender['id']}: {lender['name']}\n{json.dumps(lender['data'], indent=2)}"
+            for lender in lenders
+        )
+        
+        prompt = f"""You are a financial matching expert. Your task is to analyze a loan application against the policies of several lenders and calculate a separate match score for each lender.
+
+Loan Application Data:
+{json.dumps(application_data, indent=2)}
+
+Lender Policies:
+{lender_sections}
+
+Analyze each lender independently against this loan application, considering:
+{_MATCH_SCORING_GUIDE}
+
+Return ONLY a valid JSON object with one entry per lender, using the lender IDs given above:
+{{
+    "matches": [
+        {{
+            "lender_id": <lender ID>,
+            "match_score": <number between 0-100>,
+            "match_category": "<excellent|very_good|good|fair|poor|very_poor>",
+            "strengths": ["<list of matching strengths>"],
+            "weaknesses": ["<list of matching weaknesses>"],
+            "recommendations": ["<list of recommendations for the applicant>"],
+            "criteria_scores": {{
+                "loan_amount": <0-10>,
+                "loan_type": <0-10>,
+                "interest_rate": <0-10>,
+                "eligibility": <0-10>,
+                "tenure": <0-10>,
+                "credit_profile": <0-10>,
+                "income": <0-10>,
+                "documentation": <0-10>,
+                "special_conditions": <0-10>,
+                "overall_fit": <0-10>
+            }},
+            "summary": "<brief summary of the match analysis>"
+        }}
+    ]
+}}
+
+Be objective and thorough in your analysis. Consider both positive and negative aspects. Do not let one lender's policy influence another lender's score.
 """
         return prompt
     
@@ -257,27 +330,237 @@ Be objective and thorough in your analysis. Consider both positive and negative
         
         results = []
         for lender in lenders:
-            try:
-                result = await self.calculate_match_score(
-                    application_data=application_data,
-                    lender_data=lender.get("data", {}),
-                    lender_name=lender.get("name", "Unknown"),
-                    application_id=lender.get("application_id", 0),
-                    lender_id=lender.get("id", 0)
-                )
+            results.append(await self._calculate_match_result(
+                application_data, lender, lender.get("application_id", 0)
+            ))
+        
+        logger.info(f"Batch calculation completed. {len(results)} results")
+        return results
+    
+    async def _calculate_match_result(
+        self,
+        application_data: Dict[str, Any],
+        lender: Dict[str, Any],
+        application_id: int
+    ) -> Dict[str, Any]:
+        """Score one lender with calculate_match_score, reporting a failure as a result."""
+        try:
+            result = await self.calculate_match_score(
+                application_data=application_data,
+                lender_data=lender.get("data", {}),
+                lender_name=lender.get("name", "Unknown"),
+                application_id=application_id,
+                lender_id=lender.get("id", 0)
+            )
+            return {
+                "lender_id": lender.get("id"),
+                "success": True,
+                **result
+            }
+        except Exception as e:
+            logger.error(f"Failed to calculate match for lender {lender.get('id')}: {str(e)}")
+            return {
+                "lender_id": lender.get("id"),
+                "success": False,
+                "error": str(e)
+            }
+    
+    def prefilter_lenders(
+        self,
+        application_data: Dict[str, Any],
+        lenders: list[Dict[str, Any]]
+    ) -> tuple[list[Dict[str, Any]], list[Dict[str, Any]]]:
+        """
+        Split lenders by whether they can offer the requested loan type.
+        
+        A lender is rejected only when both the application's loan_type and the
+        lender's loan_types are present and no offered type mentions the
+        requested one. Anything less certain is left for the LLM to score.
+        
+        Args:
+            application_data: Processed loan application data
+            lenders: List of lender dictionaries with 'id', 'name', and 'data' keys
+        
+        Returns:
+            Tuple of (lenders to score, lenders rejected by the prefilter)
+        """
+        requested = application_data.get("loan_type")
+        if not isinstance(requested, str) or not requested.strip():
+            return lenders, []
+        requested = requested.strip().lower()
+        
+        eligible = []
+        rejected = []
+        for lender in lenders:
+            offered = (lender.get("data") or {}).get("loan_types")
+            if not isinstance(offered, list) or not offered or any(
+                requested in str(loan_type).lower() or str(loan_type).lower() in requested
+                for loan_type in offered
+            ):
+                eligible.append(lender)
+            else:
+                rejected.append(lender)
+        
+        if rejected:
+            logger.info(f"Prefilter skipped {len(rejected)} lenders that do not offer {requested} loans")
+        
+        return eligible, rejected
+    
+    def _build_prefiltered_result(
+        self,
+        application_data: Dict[str, Any],
+        lender: Dict[str, Any],
+        application_id: int
+    ) -> Dict[str, Any]:
+        """Build the match result for a lender rejected by prefilter_lenders."""
+        loan_type = application_data.get("loan_type")
+        match_analysis = {
+            "match_score": 0,
+            "match_category": "very_poor",
+            "strengths": [],
+            "weaknesses": [f"Lender does not offer {loan_type} loans"],
+            "recommendations": ["Consider lenders that offer this loan type"],
+            "criteria_scores": {},
+            "summary": f"{lender['name']} does not offer the requested {loan_type} loan type.",
+            "_metadata": {
+                "prefiltered": True,
+                "application_id": application_id,
+                "lender_id": lender["id"],
+                "lender_name": lender["name"],
+                "calculation_successful": True
+            }
+        }
+        return {
+            "lender_id": lender["id"],
+            "success": True,
+            "match_score": 0,
+            "match_analysis": match_analysis
+        }
+    
+    async def calculate_match_scores_batch(
+        self,
+        application_data: Dict[str, Any],
+        lenders: list[Dict[str, Any]],
+        application_id: int
+    ) -> list[Dict[str, Any]]:
+        """
+        Calculate match scores for an application against several lenders in one request.
+        
+        The application data is sent once for the whole batch, so K lenders cost
+        a single LLM round-trip. Lenders without a result from the reply, or the
+        whole batch if the request or its parsing fails, are retried concurrently
+        with one calculate_match_score request each.
+        
+        Args:
+            application_data: Processed loan application data
+            lenders: List of lender dictionaries with 'id', 'name', and 'data' keys
+            application_id: ID of the loan application
+        
+        Returns:
+            List of match results in the same format as batch_calculate_matches
+        """
+        results = []
+        if self.prefilter_loan_type:
+            lenders, rejected = self.prefilter_lenders(application_data, lenders)
+            results.extend(
+                self._build_prefiltered_result(application_data, lender, application_id)
+                for lender in rejected
+            )
+            if not lenders:
+                return results
+        
+        if len(lenders) == 1:
+            results.append(await self._calculate_match_result(application_data, lenders[0], application_id))
+            return results
+        
+        prefiltered_count = len(results)
+        
+        try:
+            logger.info(
+                f"Calculating match scores for Application ID {application_id} "
+                f"against {len(lenders)} lenders in one request"
+            )
+            
+            # Validate client
+            if not self.client:
+                logger.error("OpenAI client not initialized. API key missing.")
+                raise ValueError("OpenAI API key not configured")
+            
+            if not application_data:
+                logger.error("Empty application data provided")
+                raise ValueError("Application data is empty")
+            
+            prompt = self._build_batch_match_prompt(application_data, lenders)
+            
+            logger.debug(f"Sending batch match request to OpenAI (model: {self.model})")
+            
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a financial matching expert specialized in analyzing loan applications against lender policies and calculating accurate match scores."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
+            )
+            
+            content = response.choices[0].message.content
+            
+            logger.debug(f"Received batch match analysis from OpenAI: {len(content)} characters")
+            
+            analyses = {}
+            for entry in json.loads(content).get("matches", []):
+                if isinstance(entry, dict) and "match_score" in entry:
+                    analyses[str(entry.pop("lender_id", ""))] = entry
+            
+            for lender in lenders:
+                match_analysis = analyses.get(str(lender["id"]))
+                if match_analysis is None or not lender.get("data"):
+                    continue
+                
+                match_analysis["_metadata"] = {
+                    "model": self.model,
+                    "temperature": self.temperature,
+                    "tokens_used": response.usage.total_tokens,
+                    "batch_size": len(lenders),
+                    "application_id": application_id,
+                    "lender_id": lender["id"],
+                    "lender_name": lender["name"],
+                    "calculation_successful": True
+                }
                 results.append({
-                    "lender_id": lender.get("id"),
+                    "lender_id": lender["id"],
                     "success": True,
-                    **result
-                })
-            except Exception as e:
-                logger.error(f"Failed to calculate match for lender {lender.get('id')}: {str(e)}")
-                results.append({
-                    "lender_id": lender.get("id"),
-                    "success": False,
-                    "error": str(e)
+                    "match_score": match_analysis["match_score"],
+                    "match_analysis": match_analysis
                 })
+            
+            logger.info(
+                f"Batch match calculation completed. Scored {len(results) - prefiltered_count}/{len(lenders)} "
+                f"lenders, {prefiltered_count} prefiltered. Tokens used: {response.usage.total_tokens}"
+            )
+            
+        except Exception as e:
+            logger.error(
+                f"Batch match calculation failed for Application {application_id}: {str(e)}",
+                exc_info=True
+            )
+        
+        # Whatever the batch did not produce a result for, including lenders left
+        # over when parsing failed part-way, is scored individually
+        scored_ids = {result["lender_id"] for result in results}
+        unscored = [lender for lender in lenders if lender["id"] not in scored_ids]
+        if unscored:
+            logger.info(f"Falling back to individual match requests for {len(unscored)} lenders")
+            results.extend(await asyncio.gather(*(
+                self._calculate_match_result(application_data, lender, application_id)
+                for lender in unscored
+            )))
         
-        logger.info(f"Batch calculation completed. {len(results)} results")
         return results
-
@@ -0,0 +1,45 @@
+"""
+OCR Post-processing Module
+
+Cleans up common Tesseract artifacts in extracted text before it is stored
+and sent to the LLM.
+"""
+import re
+from typing import Callable, Dict
+
+# All fix-ups are alternatives of a single pattern so the text is scanned once,
+# no matter how many rules there are. Each rule is a named group.
+#
+# Line-break hyphens and repeated spaces are deliberately left alone: without a
+# dictionary "self-\nemployed" cannot be told apart from "applica-\ntion", and
+# the column spacing of rate and fee tables is what lets the LLM read them.
+_RULES: Dict[str, str] = {
+    # Letter O misread inside a number, e.g. "$5,0O0" or "1O%"
+    "zero": r"(?<=\d)[Oo]+(?=[\d,.%])",
+    # Runs of blank lines left behind by page layout
+    "blank_lines": r"\n[ \t]*\n(?:[ \t]*\n)+",
+}
+
+_PATTERN = re.compile("|".join(f"(?P<{name}>{rule})" for name, rule in _RULES.items()))
+
+_REPLACEMENTS: Dict[str, Callable[[re.Match], str]] = {
+    "zero": lambda match: "0" * len(match.group()),
+    "blank_lines": lambda match: "\n\n",
+}
+
+
+def _replace(match: re.Match) -> str:
+    return _REPLACEMENTS[match.lastgroup](match)
+
+
+def clean_ocr_text(text: str) -> str:
+    """
+    Apply all OCR fix-ups to text in a single scan.
+
+    Args:
+        text: Raw text produced by OCR
+
+    Returns:
+        str: Cleaned text
+    """
+    return _PATTERN.sub(_replace, text)
@@ -1,17 +1,27 @@
 """
 OCR Service Module
 
-Handles PDF document reading and OCR text extraction using Tesseract.
+Handles PDF document reading and text extraction, using the PDF's native
+text layer when present and falling back to OCR with Tesseract.
 """
 import logging
-import tempfile
-from pathlib import Path
-from typing import Optional
+from statistics import median
+from typing import List, Optional
 import fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
 import io
 
+from app.services.ocr_postprocess import clean_ocr_text
+
+# OpenCV is optional (the "ocr" extra); without it pages are OCR'd as plain grayscale
+try:
+    import cv2
+    import numpy as np
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -24,19 +34,65 @@ class OCRService:
     and pytesseract for OCR text extraction.
     """
     
-    def __init__(self, tesseract_cmd: Optional[str] = None):
+    def __init__(
+        self,
+        tesseract_cmd: Optional[str] = None,
+        native_text_threshold: int = 200
+    ):
         """
         Initialize OCR Service
         
         Args:
             tesseract_cmd: Optional path to tesseract executable.
                           If None, uses system default.
+            native_text_threshold: Median characters per page in the PDF's
+                          native text layer above which OCR is skipped
+                          (default: 200)
         """
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         
+        self.native_text_threshold = native_text_threshold
+        
         logger.info("OCR Service initialized")
     
+    def _has_native_text_layer(self, native_texts: List[str]) -> bool:
+        """
+        Check whether a PDF is born-digital with a usable text layer.
+        
+        Args:
+            native_texts: Text returned by PyMuPDF for each page
+        
+        Returns:
+            bool: True if the median page length meets the threshold
+        """
+        if not native_texts:
+            return False
+        return median(len(text.strip()) for text in native_texts) >= self.native_text_threshold
+    
+    def _preprocess_page(self, pix: "fitz.Pixmap") -> Image.Image:
+        """
+        Convert a grayscale page pixmap into an image ready for Tesseract.
+        
+        When OpenCV is installed the page is binarized with adaptive
+        thresholding, which spares Tesseract its own Otsu pass and copes
+        better with uneven scan lighting.
+        
+        Args:
+            pix: Single-channel grayscale pixmap of the page
+        
+        Returns:
+            Image.Image: 8-bit grayscale ("L") image
+        """
+        if not HAS_CV2:
+            return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        
+        gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+        binary = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+        )
+        return Image.fromarray(binary)
+    
     async def extract_text_from_pdf(
         self, 
         pdf_bytes: bytes,
@@ -44,7 +100,11 @@ class OCRService:
         language: str = 'eng'
     ) -> str:
         """
-        Extract text from PDF using OCR.
+        Extract text from PDF, using OCR only where needed.
+        
+        Born-digital PDFs are read from their native text layer; only pages
+        without any native text are rasterized and sent to Tesseract.
+        Scanned PDFs are OCR'd page by page.
         
         Args:
             pdf_bytes: PDF file content as bytes
@@ -76,8 +136,16 @@ class OCRService:
             
             logger.info(f"Successfully opened PDF with {pdf_document.page_count} page(s)")
             
-            # Extract text from each page
-            extracted_texts = []
+            # Probe the native text layer before falling back to OCR
+            native_texts = [page.get_text("text") for page in pdf_document]
+            use_native_text = self._has_native_text_layer(native_texts)
+            
+            if use_native_text:
+                logger.info("PDF has a native text layer, skipping OCR for text pages")
+            
+            # Extract text from each page, writing pages into one buffer as
+            # they are produced instead of holding a list of page strings
+            buffer = io.StringIO()
             
             # Calculate zoom factor for DPI
             # PyMuPDF uses a matrix for scaling. Default is 72 DPI.
@@ -88,22 +156,26 @@ class OCRService:
                 page = pdf_document[page_num]
                 logger.debug(f"Processing page {page_num + 1}/{pdf_document.page_count}")
                 
-                # Convert page to image (pixmap)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convert pixmap to PIL Image
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
-                
-                # Perform OCR on the image
-                text = pytesseract.image_to_string(
-                    image,
-                    lang=language,
-                    config='--psm 1'  # Automatic page segmentation with OSD
-                )
+                if use_native_text and native_texts[page_num].strip():
+                    text = native_texts[page_num]
+                else:
+                    # Render page straight to grayscale, no PNG round-trip
+                    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+                    image = self._preprocess_page(pix)
+                    
+                    # Perform OCR on the image and fix common OCR artifacts.
+                    # Native text is exact, so only OCR output is cleaned.
+                    text = clean_ocr_text(pytesseract.image_to_string(
+                        image,
+                        lang=language,
+                        config='--psm 1'  # Automatic page segmentation with OSD
+                    ))
                 
                 if text.strip():
-                    extracted_texts.append(f"--- Page {page_num + 1} ---\n{text}")
+                    if buffer.tell():
+                        buffer.write("\n\n")
+                    buffer.write(f"--- Page {page_num + 1} ---\n")
+                    buffer.write(text)
                     logger.debug(f"Page {page_num + 1}: Extracted {len(text)} characters")
                 else:
                     logger.warning(f"Page {page_num + 1}: No text extracted")
@@ -112,7 +184,8 @@ class OCRService:
             pdf_document.close()
             
             # Combine all pages
-            full_text = "\n\n".join(extracted_texts)
+            full_text = buffer.getvalue()
+            buffer.close()
             
             logger.info(
                 f"OCR extraction completed successfully. "
@@ -143,24 +216,14 @@ class OCRService:
         try:
             logger.info("Starting OCR extraction from image")
             
-            # Open image from bytes
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
-                tmp.write(image_bytes)
-                tmp_path = tmp.name
-            
-            try:
-                image = Image.open(tmp_path)
-                
+            # Decode image directly from memory
+            with Image.open(io.BytesIO(image_bytes)) as image:
                 # Perform OCR
                 text = pytesseract.image_to_string(image, lang=language)
-                
-                logger.info(f"Image OCR completed. Extracted {len(text)} characters")
-                return text
-                
-            finally:
-                # Cleanup temporary file
-                Path(tmp_path).unlink(missing_ok=True)
-                
+            
+            logger.info(f"Image OCR completed. Extracted {len(text)} characters")
+            return text
+            
         except Exception as e:
             logger.error(f"Image OCR failed: {str(e)}", exc_info=True)
             raise RuntimeError(f"Image OCR processing failed: {str(e)}") from e
@@ -9,7 +9,8 @@ from typing import Dict, Any
 from sqlalchemy import select, update
 
 from app.models.lender import Lender, LenderStatus
-from app.services.llm_service import LLMService
+from app.services.llm_service import llm_service
+from app.services.lender_cache import active_lender_cache
 from app.db import WorkflowAsyncSession
 
 from .hatchet_config import hatchet_client
@@ -22,9 +23,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# LLM service instance
-llm_service = LLMService()
-
 # Create workflow decorator only if hatchet_client is available
 lender_processing_workflow = None
 if hatchet_client:
@@ -43,10 +41,14 @@ if lender_processing_workflow:
 async def _process_lender_document(lender_id):
     logger.info(f"Starting processing for Lender ID: {lender_id}")
     
-    try:
-        async with WorkflowAsyncSession() as db:
-            # Fetch lender record
-            lender = await db.get(Lender, lender_id)
+    async with WorkflowAsyncSession() as db:
+        try:
+            # Fetch only the columns processing needs, not the full ORM row
+            result = await db.execute(
+                select(Lender.lender_name, Lender.raw_data, Lender.policy_details)
+                .where(Lender.id == lender_id)
+            )
+            lender = result.one_or_none()
             
             if not lender:
                 logger.error(f"Lender ID {lender_id} not found")
@@ -56,15 +58,20 @@ async def _process_lender_document(lender_id):
                 }
             
             # Update status to processing
-            lender.status = LenderStatus.PROCESSING
+            await db.execute(
+                update(Lender).where(Lender.id == lender_id).values(status=LenderStatus.PROCESSING)
+            )
             await db.commit()
+            active_lender_cache.invalidate()
             
             logger.info(f"Processing Lender: {lender.lender_name}")
             
             # Check if raw data exists
             if not lender.raw_data:
                 logger.error(f"No raw data available for Lender ID {lender_id}")
-                lender.status = LenderStatus.FAILED
+                await db.execute(
+                    update(Lender).where(Lender.id == lender_id).values(status=LenderStatus.FAILED)
+                )
                 await db.commit()
                 return {
                     "success": False,
@@ -86,44 +93,46 @@ async def _process_lender_document(lender_id):
             )
             
             # Update lender record with processed data
-            lender.processed_data = enriched_data
-            lender.status = LenderStatus.COMPLETED
-            
+            await db.execute(
+                update(Lender)
+                .where(Lender.id == lender_id)
+                .values(processed_data=enriched_data, status=LenderStatus.COMPLETED)
+            )
             await db.commit()
             
+            # Make the new lender visible to matching right away
+            active_lender_cache.invalidate()
+            
             logger.info(
                 f"Successfully completed processing for Lender ID {lender_id}. "
-                f"Status: {lender.status.value}"
+                f"Status: {LenderStatus.COMPLETED.value}"
             )
             
             return {
                 "success": True,
                 "lender_id": lender_id,
-                "status": lender.status.value,
+                "status": LenderStatus.COMPLETED.value,
                 "processed_data": enriched_data
             }
             
-    except Exception as e:
-        logger.error(
-            f"Error processing Lender ID {lender_id}: {str(e)}",
-            exc_info=True
-        )
-        
-        # Update status to failed
-        try:
-            async with WorkflowAsyncSession() as db:
+        except Exception as e:
+            logger.error(
+                f"Error processing Lender ID {lender_id}: {str(e)}",
+                exc_info=True
+            )
+            
+            # Update status to failed on the same session rather than checking out another connection
+            try:
+                await db.rollback()
                 await db.execute(
                     update(Lender).where(Lender.id == lender_id).values(status=LenderStatus.FAILED)
                 )
                 await db.commit()
-        except Exception as update_error:
-            logger.error(f"Failed to update status: {str(update_error)}")
-        
-        return {
-            "success": False,
-            "error": str(e),
-            "lender_id": lender_id
-        } 
-
-
-
+            except Exception as update_error:
+                logger.error(f"Failed to update status: {str(update_error)}")
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "lender_id": lender_id
+            }
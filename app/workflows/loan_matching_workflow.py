@@ -7,15 +7,20 @@ against multiple lenders.
 
 import logging
 import asyncio
-from typing import Dict, Any
+import os
+from typing import Any, Dict, List
 from datetime import timedelta
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.loan_application import LoanApplication, LoanMatch, ApplicationStatus, MatchStatus
 from app.models.lender import Lender, LenderStatus
+from app.services.llm_service import llm_service
 from app.services.match_service import MatchService
-from app.services.llm_service import LLMService
-from app.db import WorkflowAsyncSession
+from app.services.lender_cache import active_lender_cache
+from app.db import WORKFLOW_POOL_SIZE, WorkflowAsyncSession
 from .hatchet_config import hatchet_client
 from pydantic import BaseModel
 
@@ -25,7 +30,18 @@ logger = logging.getLogger(__name__)
 
 # Service instances
 match_service = MatchService()
-llm_service = LLMService()
+
+# Maximum number of matches calculated concurrently. Each concurrent match
+# holds one workflow database connection, so this defaults to the pool size
+# to keep matching from starving the pool.
+MATCH_CONCURRENCY = int(os.getenv("MATCH_CONCURRENCY", str(WORKFLOW_POOL_SIZE)))
+
+# Number of lenders scored per LLM request. The application data is sent once
+# per batch instead of once per lender.
+MATCH_BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "8"))
+
+# Number of lender rows fetched per round-trip when loading active lenders
+LENDER_FETCH_CHUNK_SIZE = 500
 
 # Create workflow decorator only if hatchet_client is available
 loan_matching_workflow = None
@@ -33,82 +49,232 @@ if hatchet_client:
     loan_matching_workflow = hatchet_client.workflow(name="loan-matching", on_events=["loan:application:uploaded"])
 
 
-async def _calculate_single_match(application_id: int, lender_id: int) -> Dict[str, Any]:
-    """Calculate match score for a single lender"""
+async def _get_all_active_lenders(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Fetch all lenders that have completed processing"""
+    # Select only the needed columns so no ORM instances are built, and stream
+    # them in chunks so the raw rows are never all held alongside the dicts
+    result = await db.stream(
+        select(Lender.id, Lender.lender_name, Lender.processed_data)
+        .where(Lender.status == LenderStatus.COMPLETED)
+        .execution_options(yield_per=LENDER_FETCH_CHUNK_SIZE)
+    )
+    return [
+        {"id": row.id, "name": row.lender_name, "processed_data": row.processed_data or {}}
+        async for row in result
+    ]
+
+
+async def _get_lender_data(db: AsyncSession, lender_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Return processed lender data by id, reading the database only for lenders missing from the cache"""
+    cached_lenders = await active_lender_cache.get_by_id(lambda: _get_all_active_lenders(db))
+    lender_data = {
+        lender_id: cached_lenders[lender_id]["processed_data"] for lender_id in lender_ids if lender_id in cached_lenders
+    }
+
+    missing_ids = [lender_id for lender_id in lender_ids if lender_id not in lender_data]
+    if missing_ids:
+        result = await db.execute(select(Lender.id, Lender.processed_data).where(Lender.id.in_(missing_ids)))
+        lender_data.update({row.id: row.processed_data or {} for row in result.all()})
+
+    return lender_data
+
+
+async def _create_match_records(db: AsyncSession, application_id: int, lender_ids: List[int]) -> List[int]:
+    """Insert match records for all lenders in one batched statement
+
+    Records start out as PROCESSING because calculate_matches picks them up
+    immediately, which saves a status update and commit per lender. Existing
+    records are skipped, so a retried prepare_matching step is a no-op.
+
+    The lender ids come from the per-worker active lender cache, which is not
+    invalidated when the API deletes a lender. The lenders are therefore
+    re-selected from the database inside the INSERT, so a deleted lender is
+    skipped instead of failing the whole step on its foreign key.
+
+    Returns the ids of the lenders the application has match records for.
+    """
+    dialect_insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else postgresql_insert
+    active_lenders = select(
+        literal(application_id, LoanMatch.loan_application_id.type),
+        Lender.id,
+        literal(MatchStatus.PROCESSING, LoanMatch.status.type),
+    ).where(Lender.status == LenderStatus.COMPLETED, Lender.id.in_(lender_ids))
+    await db.execute(
+        dialect_insert(LoanMatch)
+        .from_select(["loan_application_id", "lender_id", "status"], active_lenders)
+        .on_conflict_do_nothing(index_elements=["loan_application_id", "lender_id"])
+    )
+
+    result = await db.scalars(
+        select(LoanMatch.lender_id)
+        .where(LoanMatch.loan_application_id == application_id, LoanMatch.lender_id.in_(lender_ids))
+        .order_by(LoanMatch.lender_id)
+    )
+    return list(result)
+
+
+async def _calculate_match_batch(
+    db: AsyncSession, application_id: int, application_data: Dict[str, Any], lender_ids: List[int]
+) -> List[Dict[str, Any]]:
+    """Calculate match scores for a batch of lenders with one LLM request"""
     try:
-        logger.info(f"Calculating match: Application {application_id} vs Lender {lender_id}")
-
-        async with WorkflowAsyncSession() as db:
-            # Fetch application
-            application = await db.get(LoanApplication, application_id)
-            if not application:
-                raise ValueError(f"Application {application_id} not found")
-
-            # Fetch lender
-            lender = await db.get(Lender, lender_id)
-            if not lender:
-                raise ValueError(f"Lender {lender_id} not found")
-
-            # Update match status to processing
-            await db.execute(
-                update(LoanMatch)
-                .where(LoanMatch.loan_application_id == application_id, LoanMatch.lender_id == lender_id)
-                .values(status=MatchStatus.PROCESSING)
-            )
-            await db.commit()
-
-            # Calculate match score
-            match_result = await match_service.calculate_match_score(
-                application_data=application.processed_data or {},
-                lender_data=lender.processed_data or {},
-                lender_name=lender.lender_name,
+        logger.info(f"Calculating matches: Application {application_id} vs Lenders {lender_ids}")
+
+        # Fetch lender names through the match records
+        result = await db.execute(
+            select(Lender.id, Lender.lender_name)
+            .select_from(LoanMatch)
+            .join(Lender, LoanMatch.lender_id == Lender.id)
+            .where(LoanMatch.loan_application_id == application_id, LoanMatch.lender_id.in_(lender_ids))
+        )
+        rows = result.all()
+
+        results = []
+        found_ids = {row.id for row in rows}
+        for lender_id in lender_ids:
+            if lender_id not in found_ids:
+                results.append({
+                    "success": False,
+                    "lender_id": lender_id,
+                    "error": f"Match record for Application {application_id} and Lender {lender_id} not found",
+                })
+
+        if rows:
+            lender_data = await _get_lender_data(db, [row.id for row in rows])
+
+            # Calculate match scores for the whole batch
+            results.extend(await match_service.calculate_match_scores_batch(
+                application_data=application_data,
+                lenders=[{"id": row.id, "name": row.lender_name, "data": lender_data[row.id]} for row in rows],
                 application_id=application_id,
-                lender_id=lender_id,
-            )
+            ))
 
-            # Update match record with results
-            await db.execute(
-                update(LoanMatch)
-                .where(LoanMatch.loan_application_id == application_id, LoanMatch.lender_id == lender_id)
-                .values(
-                    match_score=match_result["match_score"],
-                    match_analysis=match_result["match_analysis"],
-                    status=MatchStatus.COMPLETED,
-                )
-            )
-            await db.commit()
+        for match_result in results:
+            match_result["application_id"] = application_id
 
-            logger.info(
-                f"Match completed: Application {application_id} vs Lender {lender_id} "
-                f"- Score: {match_result['match_score']}"
-            )
+        logger.info(
+            f"Matches completed: Application {application_id} vs Lenders {lender_ids} "
+            f"- {sum(match_result['success'] for match_result in results)} succeeded"
+        )
 
-            return {
-                "success": True,
-                "application_id": application_id,
-                "lender_id": lender_id,
-                "match_score": match_result["match_score"],
-            }
+        return results
 
     except Exception as e:
         logger.error(
-            f"Match calculation failed for Application {application_id} " f"and Lender {lender_id}: {str(e)}",
+            f"Match calculation failed for Application {application_id} " f"and Lenders {lender_ids}: {str(e)}",
             exc_info=True,
         )
 
-        # Update match status to failed
+        # Discard any partial work; the failures are recorded by _save_match_results
+        try:
+            await db.rollback()
+        except Exception as rollback_error:
+            logger.error(f"Failed to roll back match session: {str(rollback_error)}")
+
+        return [
+            {"success": False, "application_id": application_id, "lender_id": lender_id, "error": str(e)}
+            for lender_id in lender_ids
+        ]
+
+
+async def _calculate_matches(application_id: int, lender_ids: List[int]) -> List[Dict[str, Any]]:
+    """Calculate match scores for all lenders in batches of MATCH_BATCH_SIZE with at most MATCH_CONCURRENCY sessions"""
+    batches = [lender_ids[i:i + MATCH_BATCH_SIZE] for i in range(0, len(lender_ids), MATCH_BATCH_SIZE)]
+    pending_batches = iter(batches)
+    results = []
+
+    # The application side of every match is the same, so load it once for all batches
+    async with WorkflowAsyncSession() as db:
+        application_data = await db.scalar(
+            select(LoanApplication.processed_data).where(LoanApplication.id == application_id)
+        ) or {}
+
+    async def worker():
+        # Each worker checks out a single session and pulls batches until none are left
+        async with WorkflowAsyncSession() as db:
+            for batch in pending_batches:
+                try:
+                    batch_results = await _calculate_match_batch(db, application_id, application_data, batch)
+
+                    # Persist each batch as soon as it is scored instead of waiting for the slowest one
+                    await _save_match_results(db, application_id, batch_results)
+                    await db.commit()
+                except Exception as e:
+                    # Contain the failure to this batch so the other workers and
+                    # finalize_matching still run
+                    batch_results = await _fail_match_batch(db, application_id, batch, e)
+
+                # Analyses are stored in the database only, and the application id is
+                # already in the step output, so neither is passed between workflow steps
+                for result in batch_results:
+                    result.pop("match_analysis", None)
+                    result.pop("application_id", None)
+
+                results.extend(batch_results)
+                logger.info(f"Saved {len(results)}/{len(lender_ids)} matches for application {application_id}")
+
+    await asyncio.gather(*(worker() for _ in range(min(MATCH_CONCURRENCY, len(batches)))))
+
+    return results
+
+
+async def _fail_match_batch(
+    db: AsyncSession, application_id: int, lender_ids: List[int], error: Exception
+) -> List[Dict[str, Any]]:
+    """Roll back a batch that could not be saved and mark its match records FAILED"""
+    logger.error(
+        f"Saving matches failed for Application {application_id} and Lenders {lender_ids}: {str(error)}",
+        exc_info=True,
+    )
+    results = [
+        {"success": False, "application_id": application_id, "lender_id": lender_id, "error": str(error)}
+        for lender_id in lender_ids
+    ]
+
+    try:
+        await db.rollback()
+        await _save_match_results(db, application_id, results)
+        await db.commit()
+    except Exception as mark_error:
+        logger.error(f"Failed to mark matches as failed for Application {application_id}: {str(mark_error)}")
         try:
-            async with WorkflowAsyncSession() as db:
-                await db.execute(
-                    update(LoanMatch)
-                    .where(LoanMatch.loan_application_id == application_id, LoanMatch.lender_id == lender_id)
-                    .values(status=MatchStatus.FAILED, error_message=str(e))
-                )
-                await db.commit()
-        except Exception as update_error:
-            logger.error(f"Failed to update match status: {str(update_error)}")
+            await db.rollback()
+        except Exception as rollback_error:
+            logger.error(f"Failed to roll back match session: {str(rollback_error)}")
 
-        return {"success": False, "application_id": application_id, "lender_id": lender_id, "error": str(e)}
+    return results
+
+
+async def _save_match_results(db: AsyncSession, application_id: int, results: List[Dict[str, Any]]) -> None:
+    """Write all match outcomes with one batched UPDATE"""
+    if not results:
+        return
+
+    match_table = LoanMatch.__table__
+    await db.execute(
+        update(match_table)
+        .where(
+            match_table.c.loan_application_id == bindparam("b_application_id"),
+            match_table.c.lender_id == bindparam("b_lender_id"),
+        )
+        .values(
+            match_score=bindparam("b_match_score"),
+            match_analysis=bindparam("b_match_analysis"),
+            status=bindparam("b_status"),
+            error_message=bindparam("b_error_message"),
+        ),
+        [
+            {
+                "b_application_id": application_id,
+                "b_lender_id": result["lender_id"],
+                "b_match_score": result.get("match_score"),
+                "b_match_analysis": result.get("match_analysis"),
+                "b_status": MatchStatus.COMPLETED if result["success"] else MatchStatus.FAILED,
+                "b_error_message": result.get("error"),
+            }
+            for result in results
+        ],
+    )
 
 
 class ProcessApplicationDataInput(BaseModel):
@@ -189,31 +355,23 @@ if loan_matching_workflow:
             raise ValueError("application_id is required in workflow input")
 
         async with WorkflowAsyncSession() as db:
-            # Fetch all active lenders
-            result = await db.execute(select(Lender).where(Lender.status == LenderStatus.COMPLETED))
-            lenders = result.scalars().all()
+            # Fetch all active lenders (cached across workflow runs)
+            lenders = await active_lender_cache.get(lambda: _get_all_active_lenders(db))
 
             if not lenders:
                 logger.warning("No active lenders found")
                 return {"application_id": application_id, "lender_ids": [], "message": "No active lenders available"}
 
-            lender_ids = [lender.id for lender in lenders]
-
-            # Create match records
-            for lender_id in lender_ids:
-                match = LoanMatch(loan_application_id=application_id, lender_id=lender_id, status=MatchStatus.PENDING)
-                db.add(match)
-
-            await db.commit()
-            logger.info(f"Created {len(lender_ids)} match records for application {application_id}")
-
-            # Update application status to processing
+            # Create match records and update application status to processing in one transaction.
+            # Only lenders that still exist get a record, so they are the ones matched.
+            lender_ids = await _create_match_records(db, application_id, [lender["id"] for lender in lenders])
             await db.execute(
                 update(LoanApplication)
                 .where(LoanApplication.id == application_id)
                 .values(status=ApplicationStatus.PROCESSING)
             )
             await db.commit()
+            logger.info(f"Created {len(lender_ids)} match records for application {application_id}")
 
             logger.info(f"Prepared matching for {len(lender_ids)} lenders")
 
@@ -235,31 +393,17 @@ if loan_matching_workflow:
         # Calculate matches in parallel using asyncio
         logger.info(f"Starting parallel match calculation for {len(lender_ids)} lenders")
 
-        tasks = [_calculate_single_match(application_id, lender_id) for lender_id in lender_ids]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Process results
-        matches = []
-        success_count = 0
-        failure_count = 0
+        results = await _calculate_matches(application_id, lender_ids)
 
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Match calculation raised exception: {str(result)}")
-                failure_count += 1
-            elif isinstance(result, dict):
-                matches.append(result)
-                if result.get("success"):
-                    success_count += 1
-                else:
-                    failure_count += 1
+        # Match calculation reports failures as results rather than raising
+        success_count = sum(1 for result in results if result["success"])
+        failure_count = len(results) - success_count
 
         logger.info(f"Parallel matching completed: {success_count} succeeded, " f"{failure_count} failed")
 
         return {
             "application_id": application_id,
-            "matches": matches,
+            "matches": results,
             "success_count": success_count,
             "failure_count": failure_count,
             "total_count": len(lender_ids),
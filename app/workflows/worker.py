@@ -5,8 +5,13 @@ This script initializes and starts a Hatchet worker process that handles:
 - Lender document processing workflows
 - Loan application matching workflows
 """
+import asyncio
 import logging
 
+from sqlalchemy import text
+
+from app.db import WORKFLOW_POOL_SIZE, WorkflowAsyncSession
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,12 +20,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _ping_database():
+    async with WorkflowAsyncSession() as db:
+        await db.execute(text("SELECT 1"))
+
+
+async def warm_up_pool():
+    """
+    Open and ping WORKFLOW_POOL_SIZE connections when the worker starts.
+
+    Runs as the worker lifespan so the connections are created on the worker's
+    event loop. The first matches then skip the connection handshake, and a
+    bad DATABASE_URL fails at boot instead of on the first task.
+    """
+    await asyncio.gather(*(_ping_database() for _ in range(WORKFLOW_POOL_SIZE)))
+    logger.info(f"Warmed up {WORKFLOW_POOL_SIZE} workflow database connections")
+    yield
+
+
 def start_worker():
     from app.workflows.hatchet_config import hatchet_client
     from app.workflows.lender_processing_workflow import lender_processing_workflow
     from app.workflows.loan_matching_workflow import loan_matching_workflow
 
-    worker = hatchet_client.worker("kaaj-worker", workflows=[lender_processing_workflow, loan_matching_workflow])
+    worker = hatchet_client.worker(
+        "kaaj-worker",
+        workflows=[lender_processing_workflow, loan_matching_workflow],
+        lifespan=warm_up_pool
+    )
     
     worker.start()
 
@@ -13,9 +13,49 @@ export const API_ENDPOINTS = {
   loanApplications: {
     list: '/api/loan-applications/',
     get: (id: number) => `/api/loan-applications/${id}`,
+    status: (id: number) => `/api/loan-applications/${id}/status`,
+    events: (id: number) => `/api/loan-applications/${id}/events`,
     upload: '/api/loan-applications/upload',
     delete: (id: number) => `/api/loan-applications/${id}`,
     matches: (id: number) => `/api/loan-applications/${id}/matches`,
   },
 } as const;
 
+
+// Polling Configuration
+// Lists refresh quickly right after an upload or status change, back off
+// exponentially while items are still being processed, and refresh slowly
+// once nothing is in progress.
+export const POLLING = {
+  baseDelay: 2000,
+  multiplier: 1.5,
+  maxDelay: 15000,
+  idleDelay: 30000,
+} as const;
+
+/**
+ * Get the next refetch interval for a list with items in progress.
+ *
+ * The backoff step is derived from how long the most recently updated
+ * in-progress item has gone unchanged, so any new upload or status change
+ * resets polling to the base delay without tracking state between polls.
+ */
+export const getPollInterval = (inProgressUpdatedAt: string[]): number => {
+  if (inProgressUpdatedAt.length === 0) {
+    return POLLING.idleDelay;
+  }
+
+  const lastChange = Math.max(...inProgressUpdatedAt.map((timestamp) => Date.parse(timestamp)));
+  const elapsed = Math.max(0, Date.now() - lastChange);
+
+  // Walk the backoff schedule until it covers the time already waited
+  let delay: number = POLLING.baseDelay;
+  let scheduled = delay;
+  while (scheduled < elapsed && delay < POLLING.maxDelay) {
+    delay = Math.min(POLLING.maxDelay, delay * POLLING.multiplier);
+    scheduled += delay;
+  }
+
+  // Jitter keeps open tabs from polling in lockstep
+  return delay * (0.8 + Math.random() * 0.4);
+};
@@ -3,6 +3,7 @@ import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { format } from 'date-fns';
 import { RefreshCw, Trash2, Eye } from 'lucide-react';
 import { lenderApi, handleApiError } from '../services/api';
+import { getPollInterval } from '../config';
 import { FileUpload } from '../components/FileUpload';
 import { StatusBadge } from '../components/StatusBadge';
 import { LoadingSpinner } from '../components/LoadingSpinner';
@@ -31,7 +32,12 @@ export const Lenders: React.FC = () => {
         status_filter: statusFilter || undefined,
         limit: 100,
       }),
-    refetchInterval: 5000, // Auto-refresh every 5 seconds
+    refetchInterval: (query) =>
+      getPollInterval(
+        (query.state.data?.lenders ?? [])
+          .filter((lender) => lender.status === 'uploaded' || lender.status === 'processing')
+          .map((lender) => lender.updated_at)
+      ),
   });
 
   // Upload mutation
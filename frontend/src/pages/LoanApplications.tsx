@@ -1,13 +1,21 @@
-import React, { useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { format } from 'date-fns';
 import { RefreshCw, Trash2, Eye, TrendingUp } from 'lucide-react';
 import { loanApplicationApi, handleApiError } from '../services/api';
+import { getPollInterval } from '../config';
 import { FileUpload } from '../components/FileUpload';
 import { StatusBadge } from '../components/StatusBadge';
 import { LoadingSpinner } from '../components/LoadingSpinner';
 import { ErrorMessage } from '../components/ErrorMessage';
-import type { LoanApplication } from '../types';
+import type { LoanApplication, LoanApplicationStatusResponse } from '../types';
+
+// Fetch an application with its matches, sorted by score once here rather than on every render
+const fetchApplicationDetails = async (id: number): Promise<LoanApplication> => {
+  const fullData = await loanApplicationApi.get(id, true);
+  fullData.matches?.sort((a, b) => (b.match_score || 0) - (a.match_score || 0));
+  return fullData;
+};
 
 export const LoanApplications: React.FC = () => {
   const queryClient = useQueryClient();
@@ -19,6 +27,7 @@ export const LoanApplications: React.FC = () => {
   const [statusFilter, setStatusFilter] = useState<string>('');
   const [selectedApplication, setSelectedApplication] = useState<LoanApplication | null>(null);
   const [uploadError, setUploadError] = useState<string | null>(null);
+  const [statusStreamUnavailable, setStatusStreamUnavailable] = useState(false);
 
   // Fetch loan applications
   const {
@@ -33,7 +42,12 @@ export const LoanApplications: React.FC = () => {
         status_filter: statusFilter || undefined,
         limit: 100,
       }),
-    refetchInterval: 5000, // Auto-refresh every 5 seconds
+    refetchInterval: (query) =>
+      getPollInterval(
+        (query.state.data?.applications ?? [])
+          .filter((application) => application.status === 'uploaded' || application.status === 'processing')
+          .map((application) => application.updated_at)
+      ),
   });
 
   // Upload mutation
@@ -85,16 +99,70 @@ export const LoanApplications: React.FC = () => {
     }
   };
 
-  const handleViewDetails = async (application: LoanApplication) => {
+  const handleViewDetails = useCallback(async (application: LoanApplication) => {
     // Fetch full details with matches
     try {
-      const fullData = await loanApplicationApi.get(application.id, true);
-      setSelectedApplication(fullData);
+      setSelectedApplication(await fetchApplicationDetails(application.id));
     } catch (error) {
       console.error('Failed to fetch application details:', error);
       setSelectedApplication(application);
     }
-  };
+  }, []);
+
+  // Reload the open application after its status changed. If the reload fails,
+  // keep the shown details but record the new status, so the status effects
+  // below do not fire again for the same change.
+  const reloadSelectedApplication = useCallback(async (current: LoanApplicationStatusResponse) => {
+    try {
+      setSelectedApplication(await fetchApplicationDetails(current.application_id));
+    } catch (error) {
+      console.error('Failed to fetch application details:', error);
+      setSelectedApplication((previous) =>
+        previous && previous.id === current.application_id
+          ? { ...previous, status: current.status, updated_at: current.updated_at }
+          : previous
+      );
+    }
+  }, []);
+
+  // Follow the status of the open application while it is being processed,
+  // and reload its full details once the status changes. The subscription is
+  // keyed on the id and status only, so reloaded details with an unchanged
+  // status do not reopen the stream.
+  const selectedId = selectedApplication?.id;
+  const selectedStatus = selectedApplication?.status;
+  const selectedInProgress = selectedStatus === 'uploaded' || selectedStatus === 'processing';
+  useEffect(() => {
+    if (selectedId === undefined || !selectedInProgress || statusStreamUnavailable) {
+      return;
+    }
+    return loanApplicationApi.subscribeToStatus(
+      selectedId,
+      (current) => {
+        if (current.status !== selectedStatus) {
+          reloadSelectedApplication(current);
+        }
+      },
+      () => setStatusStreamUnavailable(true)
+    );
+  }, [selectedId, selectedStatus, selectedInProgress, statusStreamUnavailable, reloadSelectedApplication]);
+
+  // Poll the status endpoint instead when the event stream is unavailable
+  useQuery({
+    queryKey: ['loanApplicationStatus', selectedId],
+    queryFn: async () => {
+      const current = await loanApplicationApi.getStatus(selectedId!);
+      if (current.status !== selectedStatus) {
+        await reloadSelectedApplication(current);
+      }
+      return current;
+    },
+    enabled: selectedInProgress && statusStreamUnavailable,
+    refetchInterval: (query) =>
+      selectedApplication && selectedInProgress && statusStreamUnavailable
+        ? getPollInterval([query.state.data?.updated_at ?? selectedApplication.updated_at])
+        : false,
+  });
 
   const formatDate = (dateString: string) => {
     try {
@@ -380,34 +448,32 @@ export const LoanApplications: React.FC = () => {
                     Lender Matches ({selectedApplication.matches.length})
                   </h4>
                   <div className="space-y-2">
-                    {selectedApplication.matches
-                      .sort((a, b) => (b.match_score || 0) - (a.match_score || 0))
-                      .map((match) => (
-                        <div
-                          key={match.id}
-                          className="bg-gray-50 p-4 rounded-lg flex justify-between items-center"
-                        >
-                          <div className="flex-1">
-                            <div className="flex items-center space-x-2">
-                              <span className="text-sm font-medium text-gray-900">
-                                ID: {match.lender_id} | Name: {match.lender_name}
-                              </span>
-                              <StatusBadge status={match.status} />
-                            </div>
-                            {match.error_message && (
-                              <p className="text-xs text-red-600 mt-1">{match.error_message}</p>
-                            )}
+                    {selectedApplication.matches.map((match) => (
+                      <div
+                        key={match.id}
+                        className="bg-gray-50 p-4 rounded-lg flex justify-between items-center"
+                      >
+                        <div className="flex-1">
+                          <div className="flex items-center space-x-2">
+                            <span className="text-sm font-medium text-gray-900">
+                              ID: {match.lender_id} | Name: {match.lender_name}
+                            </span>
+                            <StatusBadge status={match.status} />
                           </div>
-                          {match.match_score !== null && (
-                            <div className="text-right">
-                              <div className="text-2xl font-bold text-primary-600">
-                                {match.match_score.toFixed(1)}
-                              </div>
-                              <div className="text-xs text-gray-500">Match Score</div>
-                            </div>
+                          {match.error_message && (
+                            <p className="text-xs text-red-600 mt-1">{match.error_message}</p>
                           )}
                         </div>
-                      ))}
+                        {match.match_score !== null && (
+                          <div className="text-right">
+                            <div className="text-2xl font-bold text-primary-600">
+                              {match.match_score.toFixed(1)}
+                            </div>
+                            <div className="text-xs text-gray-500">Match Score</div>
+                          </div>
+                        )}
+                      </div>
+                    ))}
                   </div>
                 </div>
               )}
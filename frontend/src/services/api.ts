@@ -6,6 +6,7 @@ import type {
   UploadLenderResponse,
   LoanApplication,
   LoanApplicationListResponse,
+  LoanApplicationStatusResponse,
   UploadLoanApplicationResponse,
   LoanMatch,
 } from '../types';
@@ -119,6 +120,43 @@ export const loanApplicationApi = {
     return response.data;
   },
 
+  /**
+   * Get only the processing status of a loan application
+   */
+  getStatus: async (id: number): Promise<LoanApplicationStatusResponse> => {
+    const response = await apiClient.get<LoanApplicationStatusResponse>(
+      API_ENDPOINTS.loanApplications.status(id)
+    );
+    return response.data;
+  },
+
+  /**
+   * Subscribe to status changes of a loan application via server-sent events.
+   * Returns a function that closes the stream.
+   */
+  subscribeToStatus: (
+    id: number,
+    onStatus: (status: LoanApplicationStatusResponse) => void,
+    onUnavailable: () => void
+  ): (() => void) => {
+    const source = new EventSource(`${API_BASE_URL}${API_ENDPOINTS.loanApplications.events(id)}`);
+    source.onmessage = (event) => {
+      const status: LoanApplicationStatusResponse = JSON.parse(event.data);
+      // Close before the server ends the stream, otherwise the browser reconnects
+      if (status.status === 'completed' || status.status === 'failed') {
+        source.close();
+      }
+      onStatus(status);
+    };
+    source.onerror = () => {
+      // A closed source is not retried, e.g. after a 404 from an older server
+      if (source.readyState === EventSource.CLOSED) {
+        onUnavailable();
+      }
+    };
+    return () => source.close();
+  },
+
   /**
    * Upload a loan application PDF document
    */
@@ -64,3 +64,9 @@ export interface UploadLoanApplicationResponse {
   workflow_run_id: string | null;
 }
 
+export interface LoanApplicationStatusResponse {
+  application_id: number;
+  status: LoanApplication['status'];
+  updated_at: string;
+}
+
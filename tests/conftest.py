@@ -5,21 +5,187 @@ This module provides pytest fixtures for testing the Kaaj API.
 """
 import asyncio
 import os
-import tempfile
-from typing import AsyncGenerator, Generator
-from unittest.mock import AsyncMock, MagicMock, patch
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, patch
 import pytest
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.pool import StaticPool
 
 # Set test environment variables before importing app modules
 # Hatchet will be mocked, so no token needed
 os.environ.setdefault("HATCHET_CLIENT_TOKEN", "")
 
+from app import db as database
 from app.main import app
 from app.models import Base
+from app.routers import lender_routes, loan_application_routes
 from app.routers.lender_routes import get_db
+from app.services.lender_cache import active_lender_cache
+from app.services.llm_service import LLMService
+from app.services.match_service import MatchService
+from app.services.ocr_service import OCRService
+from app.workflows import lender_processing_workflow, loan_matching_workflow
+
+try:
+    import uvloop
+except ImportError:  # uvicorn[standard] does not install uvloop on Windows
+    uvloop = None
+
+
+# Mocked service responses, built once at import time. The code under test
+# only reads them, so every test's mocks can share the same objects.
+
+# Structured data returned by the mocked LLM for lender processing
+MOCK_LLM_RESPONSE = {
+    "loan_types": ["Fixed Rate", "Variable Rate", "Interest Only"],
+    "interest_rates": {
+        "fixed_rate": {"min": "3.5%", "max": "4.5%"},
+        "variable_rate": {"min": "2.5%", "max": "3.5%"}
+    },
+    "eligibility_criteria": [
+        "Minimum credit score: 650",
+        "Stable employment history",
+        "Valid identification"
+    ],
+    "loan_amount_range": {
+        "min": "$50,000",
+        "max": "$5,000,000"
+    },
+    "tenure": {
+        "min": "1 year",
+        "max": "30 years"
+    },
+    "processing_fees": "Application fee applies",
+    "documents_required": [
+        "Proof of identity",
+        "Proof of income",
+        "Bank statements",
+        "Property documents"
+    ],
+    "key_terms": [
+        "LVR up to 95%",
+        "Interest only option available",
+        "Fixed and variable rate options"
+    ],
+    "contact_information": {
+        "email": "info@samplelender.com",
+        "phone": "1800 123 456",
+        "website": "www.advantagebroker.com"
+    },
+    "special_offers": [
+        "Competitive rates for 2025",
+        "Flexible repayment options"
+    ],
+    "_metadata": {
+        "model": "gpt-4o-mini",
+        "temperature": 0.2,
+        "tokens_used": 850,
+        "processing_successful": True
+    }
+}
+
+# Structured data returned by the mocked LLM for loan application processing
+MOCK_LOAN_APPLICATION_RESPONSE = {
+    "loan_type": "home",
+    "loan_amount": {"amount": 450000, "currency": "USD"},
+    "loan_purpose": "Purchase primary residence",
+    "tenure_requested": {"years": 30},
+    "employment_details": {
+        "status": "employed",
+        "employer": "Tech Corp",
+        "job_title": "Software Engineer",
+        "years_employed": 5
+    },
+    "income_details": {
+        "monthly_income": 8500,
+        "annual_income": 102000,
+        "other_income": None
+    },
+    "credit_score": 720,
+    "existing_loans": [],
+    "assets": {
+        "property": [],
+        "vehicles": [{"type": "car", "value": 30000}],
+        "investments": {"stocks": 75000}
+    },
+    "personal_information": {
+        "age": 32,
+        "marital_status": "single",
+        "dependents": 0,
+        "education": "Bachelor's Degree"
+    },
+    "contact_information": {
+        "phone": "+1-555-0100",
+        "email": "applicant@example.com",
+        "address": "123 Main St, City, State 12345"
+    },
+    "documents_provided": ["Pay stubs", "Tax returns", "Bank statements"],
+    "special_requirements": None,
+    "_metadata": {
+        "model": "gpt-4o-mini",
+        "temperature": 0.2,
+        "tokens_used": 920,
+        "processing_successful": True
+    }
+}
+
+# Validation details added by the mocked validate_and_enrich_data
+MOCK_VALIDATION = {
+    "field_completeness": {
+        "loan_types": True,
+        "interest_rates": True,
+        "eligibility_criteria": True
+    },
+    "completeness_score": 1.0
+}
+
+# Result returned by the mocked match score calculation
+MOCK_MATCH_RESPONSE = {
+    "match_score": 82.5,
+    "match_analysis": {
+        "match_score": 82.5,
+        "match_category": "very_good",
+        "strengths": [
+            "Excellent credit score",
+            "Strong income profile",
+            "Stable employment history"
+        ],
+        "weaknesses": [
+            "Limited down payment",
+            "No existing property ownership"
+        ],
+        "recommendations": [
+            "Consider mortgage insurance",
+            "Explore first-time buyer programs"
+        ],
+        "criteria_scores": {
+            "loan_amount": 9,
+            "loan_type": 10,
+            "interest_rate": 8,
+            "eligibility": 9,
+            "tenure": 8,
+            "credit_profile": 9,
+            "income": 9,
+            "documentation": 8,
+            "special_conditions": 7,
+            "overall_fit": 8
+        },
+        "summary": "Very good match with strong fundamentals and minor areas for improvement",
+        "_metadata": {
+            "model": "gpt-4o-mini",
+            "temperature": 0.2,
+            "tokens_used": 1200,
+            "application_id": 1,
+            "lender_id": 1,
+            "lender_name": "Test Lender",
+            "calculation_successful": True
+        }
+    }
+}
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -29,164 +195,145 @@ def mock_hatchet_client():
     
     This fixture is autouse=True, so it runs automatically for all tests.
     """
-    # Return None for get_hatchet_client to run in mock mode
-    with patch('app.workflows.lender_processing_workflow.hatchet_client', return_value=None), \
-         patch('app.workflows.loan_matching_workflow.hatchet_client', return_value=None):
+    # Replace the client with None (mock mode) rather than a MagicMock tree
+    with patch('app.workflows.lender_processing_workflow.hatchet_client', None), \
+         patch('app.workflows.loan_matching_workflow.hatchet_client', None):
         yield
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest.fixture(autouse=True)
+def reset_active_lender_cache():
+    """
+    Clear the in-process active lender cache around every test.
+    
+    Each test uses a fresh database, so lenders cached by an earlier test
+    must not leak into the next one.
+    """
+    active_lender_cache.invalidate()
+    yield
+    active_lender_cache.invalidate()
 
 
-@pytest.fixture(scope="function")
-def mock_hatchet_workflow():
+@pytest.fixture(scope="session")
+async def test_engine() -> AsyncGenerator[AsyncEngine, None]:
     """
-    Mock Hatchet workflow triggers to avoid Hatchet dependency in tests.
+    Create the test database engine once for the whole test session.
     
-    This fixture mocks Hatchet workflow triggering.
+    This fixture:
+    - Creates an in-memory SQLite database on a single shared connection
+    - Creates all tables once, instead of once per test
+    - Disposes of the engine, and with it the database, after the session
     """
-    # Mock workflow run result
-    mock_workflow_run = MagicMock()
-    mock_workflow_run.workflow_run_id = "test-workflow-run-id-12345"
+    test_engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,  # One connection keeps the in-memory database alive
+    )
+    
+    # pysqlite's own transaction handling breaks SAVEPOINT, so let SQLAlchemy emit BEGIN
+    @event.listens_for(test_engine.sync_engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
     
-    # Mock Hatchet client
-    mock_client = MagicMock()
-    mock_client.admin.run_workflow.return_value = mock_workflow_run
+    @event.listens_for(test_engine.sync_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    # Return None to simulate mock mode (no Hatchet server)
-    yield None
+    # Create tables; the new in-memory database is empty, so skip the existence checks
+    async with test_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all, checkfirst=False)
+    
+    yield test_engine
+    
+    # Dispose of all connections
+    await test_engine.dispose()
 
 
 @pytest.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+async def db_session(test_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
     """
-    Create a fresh database session for each test using a temporary SQLite file.
+    Create a database session for each test whose changes are rolled back afterwards.
     
     This fixture:
-    - Creates a temporary SQLite database file for each test
-    - Updates DATABASE_URL environment variables to point to the temp file
-    - Creates all tables before the test
-    - Provides a clean database session
-    - Deletes the database file after the test
+    - Opens a connection to the session-wide test database and begins a transaction
+    - Binds the session to that connection in "create_savepoint" mode, so commits
+      made by the test or the code under test only release a SAVEPOINT
+    - Rolls back the outer transaction after the test, leaving empty tables
     """
-    # Create a temporary file for the SQLite database
-    db_fd, db_path = tempfile.mkstemp(suffix='.db', prefix='test_kaaj_')
-    os.close(db_fd)  # Close the file descriptor, SQLAlchemy will handle the file
-    
-    # Store original environment variables
-    original_database_url = os.environ.get("DATABASE_URL")
-    original_sync_database_url = os.environ.get("SYNC_DATABASE_URL")
-    
-    try:
-        # Update environment variables to use the temp SQLite file
-        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
-        os.environ["SYNC_DATABASE_URL"] = f"sqlite+pysqlite:///{db_path}"
-        
-        # Create test engine for this specific database file
-        test_engine = create_async_engine(
-            f"sqlite+aiosqlite:///{db_path}",
-            echo=False,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,  # Use StaticPool for SQLite in-memory/file databases
-        )
+    async with test_engine.connect() as connection:
+        transaction = await connection.begin()
         
-        # Create test session maker
-        TestSessionLocal = async_sessionmaker(
-            test_engine,
-            class_=AsyncSession,
+        # Create and yield session
+        session = AsyncSession(
+            bind=connection,
             expire_on_commit=False,
-            autocommit=False,
             autoflush=False,
+            join_transaction_mode="create_savepoint",
         )
-        
-        # Create tables
-        async with test_engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        
-        # Create and yield session
-        async with TestSessionLocal() as session:
-            try:
-                yield session
-            finally:
-                # Ensure session is closed
-                await session.rollback()
-                await session.close()
-        
-        # Dispose of all connections
-        await test_engine.dispose()
-        
-    finally:
-        # Restore original environment variables
-        if original_database_url is not None:
-            os.environ["DATABASE_URL"] = original_database_url
-        elif "DATABASE_URL" in os.environ:
-            del os.environ["DATABASE_URL"]
-            
-        if original_sync_database_url is not None:
-            os.environ["SYNC_DATABASE_URL"] = original_sync_database_url
-        elif "SYNC_DATABASE_URL" in os.environ:
-            del os.environ["SYNC_DATABASE_URL"]
-        
-        # Delete the temporary database file
-        if os.path.exists(db_path):
-            os.unlink(db_path)
+        try:
+            yield session
+        finally:
+            # Discard everything the test wrote
+            await session.close()
+            await transaction.rollback()
 
 
-@pytest.fixture(scope="function")
-async def client(db_session: AsyncSession, mock_hatchet_workflow) -> AsyncGenerator[AsyncClient, None]:
+@pytest.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
     """
-    Create a test client for the FastAPI app.
+    Create the HTTP client for the FastAPI app once for the test session.
     
-    This fixture:
-    - Overrides the database dependency to use the test database session
-    - Patches database engines to use the test SQLite database
-    - Mocks the OCR service to avoid dependency on Tesseract
-    - Mocks the LLM service to avoid OpenAI API calls
-    - Mocks the Match service to avoid OpenAI API calls
-    - Mocks the WorkflowAsyncSession to use the test session (prevents concurrency issues)
-    - Mocks Hatchet client to avoid Hatchet server dependency
+    ASGITransport calls the app in-process and holds no connections, so one
+    client can be shared; per-test state lives in the `client` fixture.
     """
-    async def override_get_db():
-        yield db_session
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@dataclass
+class ServiceMocks:
+    """Mocks standing in for the external OCR, LLM and match services."""
+    ocr_extract_text: AsyncMock
+    llm_process_raw_text: AsyncMock
+    llm_process_loan_application: AsyncMock
+    llm_validate_and_enrich_data: AsyncMock
+    match_calculate_score: AsyncMock
+
+
+class MockAsyncSessionContext:
+    """Session context manager that hands out an existing test session."""
     
-    app.dependency_overrides[get_db] = override_get_db
+    def __init__(self, session: AsyncSession):
+        self.session = session
     
-    # Create a mock session context manager that returns the test db_session
-    class MockAsyncSessionContext:
-        async def __aenter__(self):
-            return db_session
-        
-        async def __aexit__(self, exc_type, exc_val, exc_tb):
-            # Don't close the session, let the fixture handle it
-            pass
+    async def __aenter__(self) -> AsyncSession:
+        return self.session
     
-    # Mock the workflow session maker to use the test session
-    mock_workflow_session = lambda: MockAsyncSessionContext()
-    
-    # Get the test database engine from db_session's bind
-    test_engine = db_session.bind
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Don't close the session, let the db_session fixture handle it
+        pass
+
+
+async def mock_validate_enrich(processed_data, raw_text):
+    """Return the processed data with mocked validation details added."""
+    return {**processed_data, "_validation": MOCK_VALIDATION}
+
+
+@pytest.fixture(scope="session")
+def service_mocks() -> ServiceMocks:
+    """
+    Build and configure the external service mocks once for the test session.
     
-    # Mock the OCR service to return sample text and patch database engines
-    with patch('app.services.ocr_service.OCRService.extract_text_from_pdf') as mock_ocr, \
-         patch('app.services.llm_service.LLMService.process_raw_text', new_callable=AsyncMock) as mock_llm_process, \
-         patch('app.services.llm_service.LLMService.process_loan_application', new_callable=AsyncMock) as mock_llm_loan_app, \
-         patch('app.services.llm_service.LLMService.validate_and_enrich_data', new_callable=AsyncMock) as mock_llm_validate, \
-         patch('app.services.match_service.MatchService.calculate_match_score', new_callable=AsyncMock) as mock_match_score, \
-         patch('app.workflows.lender_processing_workflow.WorkflowAsyncSession', mock_workflow_session), \
-         patch('app.workflows.loan_matching_workflow.WorkflowAsyncSession', mock_workflow_session), \
-         patch('app.db.engine', test_engine), \
-         patch('app.db.workflow_engine', test_engine), \
-         patch('app.db.task_engine', test_engine), \
-         patch('app.routers.lender_routes.engine', test_engine), \
-         patch('app.routers.loan_application_routes.engine', test_engine):
-        
-        # Configure OCR mock to return sample extracted text
-        mock_ocr.return_value = """
+    The mocks always return the same responses, so only the patching (in
+    `mock_services`) and the call history reset happen per test.
+    """
+    return ServiceMocks(
+        # Sample text extracted from a lender document
+        ocr_extract_text=AsyncMock(return_value="""
         ADVANTAGE BROKER 2025
         Sample Lender Document
         
@@ -201,171 +348,84 @@ async def client(db_session: AsyncSession, mock_hatchet_workflow) -> AsyncGenera
         
         Contact: info@samplelender.com
         Phone: 1800 123 456
-        """
-        
-        # Configure LLM mock to return structured data for lender processing
-        mock_llm_response = {
-            "loan_types": ["Fixed Rate", "Variable Rate", "Interest Only"],
-            "interest_rates": {
-                "fixed_rate": {"min": "3.5%", "max": "4.5%"},
-                "variable_rate": {"min": "2.5%", "max": "3.5%"}
-            },
-            "eligibility_criteria": [
-                "Minimum credit score: 650",
-                "Stable employment history",
-                "Valid identification"
-            ],
-            "loan_amount_range": {
-                "min": "$50,000",
-                "max": "$5,000,000"
-            },
-            "tenure": {
-                "min": "1 year",
-                "max": "30 years"
-            },
-            "processing_fees": "Application fee applies",
-            "documents_required": [
-                "Proof of identity",
-                "Proof of income",
-                "Bank statements",
-                "Property documents"
-            ],
-            "key_terms": [
-                "LVR up to 95%",
-                "Interest only option available",
-                "Fixed and variable rate options"
-            ],
-            "contact_information": {
-                "email": "info@samplelender.com",
-                "phone": "1800 123 456",
-                "website": "www.advantagebroker.com"
-            },
-            "special_offers": [
-                "Competitive rates for 2025",
-                "Flexible repayment options"
-            ],
-            "_metadata": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.2,
-                "tokens_used": 850,
-                "processing_successful": True
-            }
-        }
-        
-        # Configure LLM mock for loan application processing
-        mock_loan_app_response = {
-            "loan_type": "home",
-            "loan_amount": {"amount": 450000, "currency": "USD"},
-            "loan_purpose": "Purchase primary residence",
-            "tenure_requested": {"years": 30},
-            "employment_details": {
-                "status": "employed",
-                "employer": "Tech Corp",
-                "job_title": "Software Engineer",
-                "years_employed": 5
-            },
-            "income_details": {
-                "monthly_income": 8500,
-                "annual_income": 102000,
-                "other_income": None
-            },
-            "credit_score": 720,
-            "existing_loans": [],
-            "assets": {
-                "property": [],
-                "vehicles": [{"type": "car", "value": 30000}],
-                "investments": {"stocks": 75000}
-            },
-            "personal_information": {
-                "age": 32,
-                "marital_status": "single",
-                "dependents": 0,
-                "education": "Bachelor's Degree"
-            },
-            "contact_information": {
-                "phone": "+1-555-0100",
-                "email": "applicant@example.com",
-                "address": "123 Main St, City, State 12345"
-            },
-            "documents_provided": ["Pay stubs", "Tax returns", "Bank statements"],
-            "special_requirements": None,
-            "_metadata": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.2,
-                "tokens_used": 920,
-                "processing_successful": True
-            }
-        }
-        
-        # Configure match score mock
-        mock_match_response = {
-            "match_score": 82.5,
-            "match_analysis": {
-                "match_score": 82.5,
-                "match_category": "very_good",
-                "strengths": [
-                    "Excellent credit score",
-                    "Strong income profile",
-                    "Stable employment history"
-                ],
-                "weaknesses": [
-                    "Limited down payment",
-                    "No existing property ownership"
-                ],
-                "recommendations": [
-                    "Consider mortgage insurance",
-                    "Explore first-time buyer programs"
-                ],
-                "criteria_scores": {
-                    "loan_amount": 9,
-                    "loan_type": 10,
-                    "interest_rate": 8,
-                    "eligibility": 9,
-                    "tenure": 8,
-                    "credit_profile": 9,
-                    "income": 9,
-                    "documentation": 8,
-                    "special_conditions": 7,
-                    "overall_fit": 8
-                },
-                "summary": "Very good match with strong fundamentals and minor areas for improvement",
-                "_metadata": {
-                    "model": "gpt-4o-mini",
-                    "temperature": 0.2,
-                    "tokens_used": 1200,
-                    "application_id": 1,
-                    "lender_id": 1,
-                    "lender_name": "Test Lender",
-                    "calculation_successful": True
-                }
-            }
-        }
-        
-        # Configure async mocks to return the structured responses
-        mock_llm_process.return_value = mock_llm_response
-        mock_llm_loan_app.return_value = mock_loan_app_response
-        mock_match_score.return_value = mock_match_response
-        
-        # Configure validate_and_enrich_data async mock
-        async def mock_validate_enrich(processed_data, raw_text):
-            enriched = processed_data.copy()
-            enriched["_validation"] = {
-                "field_completeness": {
-                    "loan_types": True,
-                    "interest_rates": True,
-                    "eligibility_criteria": True
-                },
-                "completeness_score": 1.0
-            }
-            return enriched
-        
-        mock_llm_validate.side_effect = mock_validate_enrich
-        
-        async with AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://test"
-        ) as ac:
-            yield ac
+        """),
+        llm_process_raw_text=AsyncMock(return_value=MOCK_LLM_RESPONSE),
+        llm_process_loan_application=AsyncMock(return_value=MOCK_LOAN_APPLICATION_RESPONSE),
+        llm_validate_and_enrich_data=AsyncMock(side_effect=mock_validate_enrich),
+        match_calculate_score=AsyncMock(return_value=MOCK_MATCH_RESPONSE),
+    )
+
+
+@pytest.fixture(scope="function")
+def mock_services(
+    db_session: AsyncSession,
+    service_mocks: ServiceMocks,
+    monkeypatch: pytest.MonkeyPatch
+) -> ServiceMocks:
+    """
+    Mock external services and route workflow database access to the test session.
+    
+    Tests that call workflow helpers directly request this fixture on its own;
+    HTTP tests get it through `client`.
+    
+    This fixture:
+    - Patches database engines to use the test SQLite database
+    - Mocks the OCR service to avoid dependency on Tesseract
+    - Mocks the LLM service to avoid OpenAI API calls
+    - Mocks the Match service to avoid OpenAI API calls
+    - Mocks the WorkflowAsyncSession to use the test session (prevents concurrency issues)
+    """
+    # Mock the workflow session maker to use the test session
+    mock_workflow_session = partial(MockAsyncSessionContext, db_session)
+    
+    # Get the test database connection from db_session's bind
+    test_engine = db_session.bind
+    
+    # Start every test with a clean call history; responses are kept
+    for mock in vars(service_mocks).values():
+        mock.reset_mock()
+    
+    # Patch the services with the shared mocks; monkeypatch undoes it after the test
+    monkeypatch.setattr(OCRService, "extract_text_from_pdf", service_mocks.ocr_extract_text)
+    monkeypatch.setattr(LLMService, "process_raw_text", service_mocks.llm_process_raw_text)
+    monkeypatch.setattr(LLMService, "process_loan_application", service_mocks.llm_process_loan_application)
+    monkeypatch.setattr(LLMService, "validate_and_enrich_data", service_mocks.llm_validate_and_enrich_data)
+    monkeypatch.setattr(MatchService, "calculate_match_score", service_mocks.match_calculate_score)
+    monkeypatch.setattr(lender_processing_workflow, "WorkflowAsyncSession", mock_workflow_session)
+    monkeypatch.setattr(loan_matching_workflow, "WorkflowAsyncSession", mock_workflow_session)
+    
+    # Patch database engines
+    for module, name in (
+        (database, "engine"),
+        (database, "workflow_engine"),
+        (database, "task_engine"),
+        (lender_routes, "engine"),
+        (loan_application_routes, "engine"),
+    ):
+        monkeypatch.setattr(module, name, test_engine)
+    
+    return service_mocks
+
+
+@pytest.fixture(scope="function")
+async def client(
+    db_session: AsyncSession,
+    mock_services,
+    http_client: AsyncClient
+) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Create a test client for the FastAPI app.
+    
+    This fixture:
+    - Overrides the database dependency to use the test database session
+    - Applies the service mocks from `mock_services`
+    """
+    async def override_get_db():
+        yield db_session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    
+    yield http_client
     
     app.dependency_overrides.clear()
 
@@ -376,13 +436,17 @@ def assets_dir() -> str:
     return os.path.join(os.path.dirname(__file__), "assets")
 
 
+# File extensions picked up as test PDFs
+PDF_EXTENSIONS = {".pdf"}
+
+
 @pytest.fixture(scope="session")
-def pdf_files(assets_dir: str) -> list[str]:
+def pdf_files(assets_dir: str) -> tuple[str, ...]:
     """
-    Get list of PDF files in the assets directory.
+    Get the PDF files in the assets directory.
     
     Returns:
-        List of absolute paths to PDF files
+        Sorted tuple of absolute paths to PDF files, so tests cannot modify it
     """
     if not os.path.exists(assets_dir):
         raise FileNotFoundError(
@@ -390,11 +454,13 @@ def pdf_files(assets_dir: str) -> list[str]:
             "Please create tests/assets/ and add your PDF files there."
         )
     
-    pdf_files = [
-        os.path.join(assets_dir, f)
-        for f in os.listdir(assets_dir)
-        if f.lower().endswith('.pdf')
-    ]
+    # scandir entries carry their name and file type, so no extra stat per file
+    with os.scandir(assets_dir) as entries:
+        pdf_files = [
+            entry.path
+            for entry in entries
+            if os.path.splitext(entry.name)[1].lower() in PDF_EXTENSIONS and entry.is_file()
+        ]
     
     if not pdf_files:
         raise FileNotFoundError(
@@ -402,74 +468,63 @@ def pdf_files(assets_dir: str) -> list[str]:
             "Please add at least one PDF file for testing."
         )
     
-    return sorted(pdf_files)
+    return tuple(sorted(pdf_files))
 
 
-@pytest.fixture
-def sample_pdf_file(pdf_files: list[str]) -> str:
+@pytest.fixture(scope="session")
+def pdf_contents(pdf_files: tuple[str, ...]) -> dict[str, bytes]:
+    """
+    Read every test PDF once for the whole test session.
+    
+    Returns:
+        Dictionary mapping each PDF path to its contents
+    """
+    contents = {}
+    for pdf_file in pdf_files:
+        with open(pdf_file, "rb") as f:
+            contents[pdf_file] = f.read()
+    return contents
+
+
+@pytest.fixture(scope="session")
+def sample_pdf_file(pdf_files: tuple[str, ...]) -> str:
     """Return the first PDF file from the assets directory."""
-    print("Using PDF FIle: ", pdf_files[0])
     return pdf_files[0]
 
 
-@pytest.fixture
-def all_pdf_files(pdf_files: list[str]) -> list[str]:
+@pytest.fixture(scope="session")
+def sample_pdf_filename(sample_pdf_file: str) -> str:
+    """Return the base name of the sample PDF file, as sent in uploads."""
+    return os.path.basename(sample_pdf_file)
+
+
+@pytest.fixture(scope="session")
+def all_pdf_files(pdf_files: tuple[str, ...]) -> tuple[str, ...]:
     """Return all PDF files from the assets directory."""
     return pdf_files
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def expected_llm_response() -> dict:
     """
     Return the expected mocked LLM response structure.
     
     This fixture provides the exact structure that the mocked LLM service returns,
-    allowing tests to verify against this expected response.
+    allowing tests to verify against this expected response. It is the shared
+    MOCK_LLM_RESPONSE object, so tests must not modify it.
     """
-    return {
-        "loan_types": ["Fixed Rate", "Variable Rate", "Interest Only"],
-        "interest_rates": {
-            "fixed_rate": {"min": "3.5%", "max": "4.5%"},
-            "variable_rate": {"min": "2.5%", "max": "3.5%"}
-        },
-        "eligibility_criteria": [
-            "Minimum credit score: 650",
-            "Stable employment history",
-            "Valid identification"
-        ],
-        "loan_amount_range": {
-            "min": "$50,000",
-            "max": "$5,000,000"
-        },
-        "tenure": {
-            "min": "1 year",
-            "max": "30 years"
-        },
-        "processing_fees": "Application fee applies",
-        "documents_required": [
-            "Proof of identity",
-            "Proof of income",
-            "Bank statements",
-            "Property documents"
-        ],
-        "key_terms": [
-            "LVR up to 95%",
-            "Interest only option available",
-            "Fixed and variable rate options"
-        ],
-        "contact_information": {
-            "email": "info@samplelender.com",
-            "phone": "1800 123 456",
-            "website": "www.advantagebroker.com"
-        },
-        "special_offers": [
-            "Competitive rates for 2025",
-            "Flexible repayment options"
-        ],
-        "_metadata": {
-            "model": "gpt-4o-mini",
-            "temperature": 0.2,
-            "tokens_used": 850,
-            "processing_successful": True
-        }
-    }
\ No newline at end of file
+    return MOCK_LLM_RESPONSE
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """
+    Run the test event loop on uvloop when it is installed, as the API server does.
+    
+    Without uvloop the default asyncio loop is named explicitly, because the hook
+    must always return at least one factory. The hook only exists from
+    pytest-asyncio 1.4.0; older versions ignore it and keep the default loop.
+    """
+    if uvloop is not None:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
@@ -0,0 +1,59 @@
+"""
+Test Cases for Active Lender Cache
+
+This module tests loading, expiry, and invalidation of the in-process
+active lender cache used by the matching workflow.
+"""
+from unittest.mock import AsyncMock
+import pytest
+
+from app.services.lender_cache import ActiveLenderCache
+
+
+class TestActiveLenderCache:
+    """Test suite for the active lender TTL cache."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_loaded_lenders(self):
+        """Test that the loader runs once while the entry is fresh."""
+        loader = AsyncMock(return_value=[{"id": 1, "name": "Bank A"}])
+        cache = ActiveLenderCache(ttl_seconds=60)
+
+        first = await cache.get(loader)
+        second = await cache.get(loader)
+
+        assert first == second == [{"id": 1, "name": "Bank A"}]
+        loader.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reloads_after_invalidate_and_expiry(self):
+        """Test that invalidation and TTL expiry both force a reload."""
+        loader = AsyncMock(return_value=[])
+        cache = ActiveLenderCache(ttl_seconds=60)
+
+        await cache.get(loader)
+        cache.invalidate()
+        await cache.get(loader)
+
+        assert loader.await_count == 2
+
+        expiring_cache = ActiveLenderCache(ttl_seconds=0)
+        await expiring_cache.get(loader)
+        await expiring_cache.get(loader)
+
+        assert loader.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_shares_loaded_lenders(self):
+        """Test that the id index is built from the same cached load."""
+        loader = AsyncMock(return_value=[{"id": 1, "processed_data": {"loan_types": ["home"]}}])
+        cache = ActiveLenderCache(ttl_seconds=60)
+
+        lenders = await cache.get(loader)
+        lenders_by_id = await cache.get_by_id(loader)
+
+        assert lenders_by_id[1] is lenders[0]
+        loader.assert_awaited_once()
+
+        cache.invalidate()
+        assert await cache.get_by_id(AsyncMock(return_value=[])) == {}
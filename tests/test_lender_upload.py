@@ -14,15 +14,26 @@ The expected_llm_response fixture provides the exact structure returned by the m
 """
 import json
 import os
+from unittest.mock import AsyncMock, patch
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.lender import Lender, LenderStatus
 from app.workflows.lender_processing_workflow import _process_lender_document
 
 
+POLICY_DETAILS = {
+    "policy_type": "Commercial",
+    "coverage_amount": 1000000,
+    "term": "12 months"
+}
+POLICY_DETAILS_JSON = json.dumps(POLICY_DETAILS)
+
+BULK_LENDER_COUNT = 50
+
+
 class TestLenderUpload:
     """Test suite for lender PDF upload functionality."""
     
@@ -31,23 +42,24 @@ class TestLenderUpload:
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test successful upload of a single PDF file."""
         # Prepare form data
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "lender_name": "Test Lender",
-                "created_by": "test_user"
-            }
-            
-            # Upload PDF
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {
+            "lender_name": "Test Lender",
+            "created_by": "test_user"
+        }
+        
+        # Upload PDF
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         # Assertions on response
         assert response.status_code == 201
@@ -61,118 +73,111 @@ class TestLenderUpload:
         lender_id = response_data["lender_id"]
         
         # Assertions on database
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one_or_none()
+        lender = await db_session.get(Lender, lender_id)
         
         assert lender is not None
         assert lender.lender_name == "Test Lender"
         assert lender.status == LenderStatus.UPLOADED
-        assert lender.raw_data is not None
-        assert len(lender.raw_data) > 0
+        assert lender.raw_data  # OCR text was extracted
         assert lender.created_by == "test_user"
-        assert lender.original_filename == os.path.basename(sample_pdf_file)
+        assert lender.original_filename == sample_pdf_filename
         assert lender.processed_data is None  # Not processed yet
+        
+        # Timestamps are set on insert
+        assert lender.created_at is not None
+        assert lender.updated_at is not None
+        assert lender.created_at <= lender.updated_at
     
     @pytest.mark.asyncio
     async def test_upload_with_policy_details(
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test upload with additional policy details."""
-        policy_details = {
-            "policy_type": "Commercial",
-            "coverage_amount": 1000000,
-            "term": "12 months"
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {
+            "lender_name": "Premium Lender",
+            "policy_details": POLICY_DETAILS_JSON,
+            "created_by": "admin"
         }
         
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "lender_name": "Premium Lender",
-                "policy_details": json.dumps(policy_details),
-                "created_by": "admin"
-            }
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         lender_id = response.json()["lender_id"]
         
         # Verify policy details are stored
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one()
+        lender = await db_session.get(Lender, lender_id)
         
-        assert lender.policy_details is not None
-        assert lender.policy_details["policy_type"] == "Commercial"
-        assert lender.policy_details["coverage_amount"] == 1000000
-        assert lender.policy_details["term"] == "12 months"
+        assert lender.policy_details == POLICY_DETAILS
     
     @pytest.mark.asyncio
     async def test_upload_multiple_pdfs(
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        all_pdf_files: list[str]
+        all_pdf_files: tuple[str, ...],
+        pdf_contents: dict[str, bytes]
     ):
         """Test uploading multiple PDF files."""
         uploaded_ids = []
         
         for idx, pdf_file in enumerate(all_pdf_files):
-            with open(pdf_file, "rb") as f:
-                files = {"file": (os.path.basename(pdf_file), f, "application/pdf")}
-                data = {
-                    "lender_name": f"Lender {idx + 1}",
-                    "created_by": "batch_user"
-                }
-                
-                response = await client.post(
-                    "/api/lenders/upload",
-                    files=files,
-                    data=data
-                )
+            files = {"file": (os.path.basename(pdf_file), pdf_contents[pdf_file], "application/pdf")}
+            data = {
+                "lender_name": f"Lender {idx + 1}",
+                "created_by": "batch_user"
+            }
+            
+            response = await client.post(
+                "/api/lenders/upload",
+                files=files,
+                data=data
+            )
             
             assert response.status_code == 201
             uploaded_ids.append(response.json()["lender_id"])
         
-        # Verify all uploads in database
-        result = await db_session.execute(select(Lender))
-        all_lenders = result.scalars().all()
+        # Verify all uploads in database with a single query
+        result = await db_session.execute(
+            select(Lender).where(Lender.id.in_(uploaded_ids))
+        )
+        lenders_by_id = {lender.id: lender for lender in result.scalars()}
         
-        assert len(all_lenders) == len(all_pdf_files)
-        assert all(lender.status == LenderStatus.UPLOADED for lender in all_lenders)
-        assert all(lender.raw_data is not None for lender in all_lenders)
+        assert lenders_by_id.keys() == set(uploaded_ids)
+        assert {lender.status for lender in lenders_by_id.values()} == {LenderStatus.UPLOADED}
+        assert not any(lender.raw_data is None for lender in lenders_by_id.values())
     
     @pytest.mark.asyncio
     async def test_upload_and_process(
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test upload followed by manual processing (without Celery)."""
         # Upload PDF
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "lender_name": "Process Test Lender",
-                "created_by": "processor"
-            }
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {
+            "lender_name": "Process Test Lender",
+            "created_by": "processor"
+        }
+        
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         lender_id = response.json()["lender_id"]
@@ -180,26 +185,20 @@ class TestLenderUpload:
         # Manually call the processing function (bypassing Celery)
         result = await _process_lender_document(lender_id)
         
-        # Refresh session to get updated data
-        db_session.expire_all()
-        
         # Verify processing result
         assert result["success"] is True
         assert result["lender_id"] == lender_id
         assert result["status"] == "completed"
         
-        # Verify database state after processing
-        db_result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = db_result.scalar_one()
+        # Verify database state after processing; reload only the processed columns
+        lender = await db_session.get(Lender, lender_id)
+        await db_session.refresh(lender, attribute_names=["status", "processed_data"])
         
         # Verify status is COMPLETED with mocked LLM
         assert lender.status == LenderStatus.COMPLETED
         
         # Verify processed_data structure from mocked LLM response
         assert lender.processed_data is not None
-        assert isinstance(lender.processed_data, dict)
         
         # Assert specific fields from mocked LLM response
         assert "loan_types" in lender.processed_data
@@ -276,21 +275,20 @@ class TestLenderUpload:
     async def test_upload_missing_lender_name(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
     ):
         """Test upload without required lender_name field."""
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "created_by": "test_user"
-                # lender_name is missing
-            }
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        # Form validation rejects the request before the file is read, so a stub PDF suffices
+        files = {"file": ("missing_name.pdf", b"%PDF-", "application/pdf")}
+        data = {
+            "created_by": "test_user"
+            # lender_name is missing
+        }
+        
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 422  # Validation error
 
@@ -302,19 +300,20 @@ class TestLenderRetrievalAfterUpload:
     async def test_get_lender_after_upload(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test retrieving a lender record after upload."""
         # Upload
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {"lender_name": "Retrieve Test", "created_by": "user"}
-            
-            upload_response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {"lender_name": "Retrieve Test", "created_by": "user"}
+        
+        upload_response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         lender_id = upload_response.json()["lender_id"]
         
@@ -328,27 +327,27 @@ class TestLenderRetrievalAfterUpload:
         assert lender_data["lender_name"] == "Retrieve Test"
         assert lender_data["status"] == "uploaded"
         assert lender_data["created_by"] == "user"
-        assert lender_data["original_filename"] == os.path.basename(sample_pdf_file)
+        assert lender_data["original_filename"] == sample_pdf_filename
     
     @pytest.mark.asyncio
     async def test_list_lenders_after_multiple_uploads(
         self,
         client: AsyncClient,
-        all_pdf_files: list[str]
+        all_pdf_files: tuple[str, ...],
+        pdf_contents: dict[str, bytes]
     ):
         """Test listing all lenders after multiple uploads."""
         # Upload multiple files
         upload_count = min(3, len(all_pdf_files))  # Upload up to 3 files
         
         for idx in range(upload_count):
-            with open(all_pdf_files[idx], "rb") as f:
-                files = {"file": (os.path.basename(all_pdf_files[idx]), f, "application/pdf")}
-                data = {
-                    "lender_name": f"List Test Lender {idx + 1}",
-                    "created_by": "batch_user"
-                }
-                
-                await client.post("/api/lenders/upload", files=files, data=data)
+            files = {"file": (os.path.basename(all_pdf_files[idx]), pdf_contents[all_pdf_files[idx]], "application/pdf")}
+            data = {
+                "lender_name": f"List Test Lender {idx + 1}",
+                "created_by": "batch_user"
+            }
+            
+            await client.post("/api/lenders/upload", files=files, data=data)
         
         # List all lenders
         list_response = await client.get("/api/lenders/")
@@ -356,30 +355,28 @@ class TestLenderRetrievalAfterUpload:
         assert list_response.status_code == 200
         list_data = list_response.json()
         
-        assert list_data["total"] >= upload_count
-        assert len(list_data["lenders"]) >= upload_count
+        # Each test runs in its own rolled-back transaction, so only these uploads are listed
+        assert list_data["total"] == upload_count
+        assert {l["lender_name"] for l in list_data["lenders"]} == {
+            f"List Test Lender {idx + 1}" for idx in range(upload_count)
+        }
         
         # Verify all have uploaded status
-        uploaded_lenders = [
-            l for l in list_data["lenders"]
-            if l["lender_name"].startswith("List Test Lender")
-        ]
-        assert len(uploaded_lenders) == upload_count
-        assert all(l["status"] == "uploaded" for l in uploaded_lenders)
+        assert {l["status"] for l in list_data["lenders"]} == {"uploaded"}
     
     @pytest.mark.asyncio
     async def test_filter_lenders_by_status(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        db_session: AsyncSession
     ):
         """Test filtering lenders by status."""
-        # Upload a file
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {"lender_name": "Filter Test", "created_by": "user"}
-            
-            await client.post("/api/lenders/upload", files=files, data=data)
+        # Insert rows directly; this test only exercises the list filter, not the upload path
+        db_session.add_all([
+            Lender(lender_name="Filter Test", status=LenderStatus.UPLOADED, raw_data="x", created_by="user"),
+            Lender(lender_name="Filter Done", status=LenderStatus.COMPLETED, raw_data="x", created_by="user"),
+        ])
+        await db_session.commit()
         
         # Filter by uploaded status
         response = await client.get("/api/lenders/?status_filter=uploaded")
@@ -387,8 +384,9 @@ class TestLenderRetrievalAfterUpload:
         assert response.status_code == 200
         data = response.json()
         
-        assert data["total"] >= 1
-        assert all(l["status"] == "uploaded" for l in data["lenders"])
+        assert data["total"] == 1
+        assert [l["lender_name"] for l in data["lenders"]] == ["Filter Test"]
+        assert {l["status"] for l in data["lenders"]} == {"uploaded"}
 
 
 class TestProcessingWorkflow:
@@ -400,22 +398,23 @@ class TestProcessingWorkflow:
         client: AsyncClient,
         db_session: AsyncSession,
         sample_pdf_file: str,
-        expected_llm_response: dict
+        sample_pdf_filename: str,
+        expected_llm_response: dict,
+        pdf_contents: dict[str, bytes]
     ):
         """Test that LLM processing returns the expected mocked structure."""
         # Upload PDF
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "lender_name": "LLM Response Test",
-                "created_by": "test_user"
-            }
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {
+            "lender_name": "LLM Response Test",
+            "created_by": "test_user"
+        }
+        
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         lender_id = response.json()["lender_id"]
@@ -423,17 +422,12 @@ class TestProcessingWorkflow:
         # Process the document
         processing_result = await _process_lender_document(lender_id)
         
-        # Refresh session
-        db_session.expire_all()
-        
         # Verify processing was successful
         assert processing_result["success"] is True
         
-        # Get the processed lender
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one()
+        # Get the processed lender, reloading only the processed columns
+        lender = await db_session.get(Lender, lender_id)
+        await db_session.refresh(lender, attribute_names=["status", "processed_data"])
         
         # Verify status
         assert lender.status == LenderStatus.COMPLETED
@@ -441,75 +435,49 @@ class TestProcessingWorkflow:
         # Comprehensive validation of processed_data against expected mock
         processed_data = lender.processed_data
         
-        # Compare all top-level keys (excluding _validation which is added by enrichment)
-        for key in expected_llm_response.keys():
-            assert key in processed_data, f"Missing key: {key}"
-            assert processed_data[key] == expected_llm_response[key], \
-                f"Mismatch in {key}: expected {expected_llm_response[key]}, got {processed_data[key]}"
+        # The stored structure is exactly the mocked LLM output plus enrichment's _validation
+        assert {
+            key: value for key, value in processed_data.items() if key != "_validation"
+        } == expected_llm_response
         
         # Verify the enrichment added validation data
-        assert "_validation" in processed_data
         assert "field_completeness" in processed_data["_validation"]
         assert "completeness_score" in processed_data["_validation"]
         
-        # Validate specific nested structures
+        # Spot-check a few values for readability
         assert processed_data["interest_rates"]["fixed_rate"]["min"] == "3.5%"
-        assert processed_data["interest_rates"]["variable_rate"]["max"] == "3.5%"
-        assert processed_data["loan_amount_range"]["min"] == "$50,000"
         assert processed_data["loan_amount_range"]["max"] == "$5,000,000"
-        assert processed_data["tenure"]["min"] == "1 year"
-        assert processed_data["tenure"]["max"] == "30 years"
-        
-        # Validate arrays
-        assert len(processed_data["loan_types"]) == 3
-        assert len(processed_data["eligibility_criteria"]) == 3
-        assert len(processed_data["documents_required"]) == 4
-        assert len(processed_data["key_terms"]) == 3
-        assert len(processed_data["special_offers"]) == 2
-        
-        # Validate contact information
-        contact = processed_data["contact_information"]
-        assert contact["email"] == "info@samplelender.com"
-        assert contact["phone"] == "1800 123 456"
-        assert contact["website"] == "www.advantagebroker.com"
-        
-        # Validate metadata
-        metadata = processed_data["_metadata"]
-        assert metadata["model"] == "gpt-4o-mini"
-        assert metadata["temperature"] == 0.2
-        assert metadata["tokens_used"] == 850
-        assert metadata["processing_successful"] is True
+        assert processed_data["_metadata"]["processing_successful"] is True
     
     @pytest.mark.asyncio
     async def test_complete_workflow_with_assertions(
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test complete workflow: upload -> process -> verify."""
         # Step 1: Upload
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {
-                "lender_name": "Workflow Test Lender",
-                "created_by": "workflow_user"
-            }
-            
-            upload_response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        data = {
+            "lender_name": "Workflow Test Lender",
+            "created_by": "workflow_user"
+        }
+        
+        upload_response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data=data
+        )
         
         assert upload_response.status_code == 201
         lender_id = upload_response.json()["lender_id"]
         
-        # Step 2: Verify initial state
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender_before = result.scalar_one()
+        # Step 2: Verify initial state; the upload shares this session, so the
+        # committed lender comes from the identity map without another query
+        lender_before = await db_session.get(Lender, lender_id)
         
         assert lender_before.status == LenderStatus.UPLOADED
         assert lender_before.raw_data is not None
@@ -518,9 +486,6 @@ class TestProcessingWorkflow:
         # Step 3: Process (manually, without Celery)
         processing_result = await _process_lender_document(lender_id)
         
-        # Refresh the session
-        db_session.expire_all()
-        
         # Step 4: Verify processing result
         assert "success" in processing_result
         assert processing_result["success"] is True
@@ -541,19 +506,9 @@ class TestProcessingWorkflow:
         assert len(processed["documents_required"]) == 4
         assert "Proof of identity" in processed["documents_required"]
         
-        # Step 5: Verify final state via API
-        get_response = await client.get(f"/api/lenders/{lender_id}")
-        assert get_response.status_code == 200
-        
-        final_data = get_response.json()
-        assert final_data["status"] == "completed"
-        assert "processed_data" in final_data
-        
-        # Step 6: Verify final state in database
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender_after = result.scalar_one()
+        # Step 5: Verify final state in database, reloading only the processed columns
+        lender_after = await db_session.get(Lender, lender_id)
+        await db_session.refresh(lender_after, attribute_names=["status", "processed_data"])
         
         assert lender_after.status == LenderStatus.COMPLETED
         assert lender_after.raw_data is not None
@@ -561,7 +516,6 @@ class TestProcessingWorkflow:
         
         # Detailed assertions on processed data structure
         processed_data = lender_after.processed_data
-        assert isinstance(processed_data, dict)
         
         # Verify all expected fields are present
         expected_fields = [
@@ -588,25 +542,25 @@ class TestProcessingWorkflow:
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        all_pdf_files: list[str]
+        all_pdf_files: tuple[str, ...],
+        pdf_contents: dict[str, bytes]
     ):
         """Test processing all uploaded PDFs."""
         lender_ids = []
         
         # Upload all PDFs
         for idx, pdf_file in enumerate(all_pdf_files):
-            with open(pdf_file, "rb") as f:
-                files = {"file": (os.path.basename(pdf_file), f, "application/pdf")}
-                data = {
-                    "lender_name": f"Batch Process Lender {idx + 1}",
-                    "created_by": "batch_processor"
-                }
-                
-                response = await client.post(
-                    "/api/lenders/upload",
-                    files=files,
-                    data=data
-                )
+            files = {"file": (os.path.basename(pdf_file), pdf_contents[pdf_file], "application/pdf")}
+            data = {
+                "lender_name": f"Batch Process Lender {idx + 1}",
+                "created_by": "batch_processor"
+            }
+            
+            response = await client.post(
+                "/api/lenders/upload",
+                files=files,
+                data=data
+            )
             
             assert response.status_code == 201
             lender_ids.append(response.json()["lender_id"])
@@ -617,18 +571,18 @@ class TestProcessingWorkflow:
             result = await _process_lender_document(lender_id)
             processing_results.append(result)
         
-        # Refresh session
-        db_session.expire_all()
-        
         # Verify all processing results
         for result in processing_results:
             assert result["success"] is True
             assert "lender_id" in result
             assert result["status"] == "completed"
         
-        # Verify all have been processed in database
+        # Verify all have been processed in database; populate_existing refreshes the
+        # uploaded rows already in the identity map instead of expiring the whole session
         result = await db_session.execute(
-            select(Lender).where(Lender.id.in_(lender_ids))
+            select(Lender)
+            .where(Lender.id.in_(lender_ids))
+            .execution_options(populate_existing=True)
         )
         processed_lenders = result.scalars().all()
         
@@ -655,66 +609,74 @@ class TestProcessingWorkflow:
             # Verify validation
             assert "_validation" in lender.processed_data
             assert lender.processed_data["_validation"]["completeness_score"] == 1.0
-
-
-class TestDataValidation:
-    """Test suite for data validation and integrity."""
     
     @pytest.mark.asyncio
-    async def test_raw_data_extraction(
+    async def test_process_many_lenders_bulk(
         self,
-        client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        mock_services
     ):
-        """Test that OCR correctly extracts text from PDF."""
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {"lender_name": "OCR Test", "created_by": "user"}
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        """Test processing many lenders inserted directly, skipping per-file HTTP uploads."""
+        # Insert all rows in one round trip; the HTTP upload contract is covered above
+        result = await db_session.execute(
+            insert(Lender)
+            .values([
+                {
+                    "lender_name": f"Bulk Lender {idx + 1}",
+                    "raw_data": "ADVANTAGE BROKER 2025 lending policy",
+                    "status": LenderStatus.UPLOADED,
+                    "created_by": "bulk_loader"
+                }
+                for idx in range(BULK_LENDER_COUNT)
+            ])
+            .returning(Lender.id)
+        )
+        lender_ids = result.scalars().all()
+        await db_session.commit()
         
-        lender_id = response.json()["lender_id"]
+        # Processing shares the test session, so run the documents one after another
+        for lender_id in lender_ids:
+            processing_result = await _process_lender_document(lender_id)
+            assert processing_result["success"] is True
         
-        # Verify raw data
         result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
+            select(Lender.status).where(Lender.id.in_(lender_ids))
         )
-        lender = result.scalar_one()
+        statuses = result.scalars().all()
         
-        assert lender.raw_data is not None
-        assert len(lender.raw_data) > 0
-        assert isinstance(lender.raw_data, str)
+        assert len(statuses) == BULK_LENDER_COUNT
+        assert set(statuses) == {LenderStatus.COMPLETED}
     
     @pytest.mark.asyncio
-    async def test_timestamp_fields(
+    async def test_processing_failure_marks_lender_failed(
         self,
         client: AsyncClient,
         db_session: AsyncSession,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        sample_pdf_filename: str,
+        pdf_contents: dict[str, bytes]
     ):
-        """Test that timestamp fields are correctly set."""
-        with open(sample_pdf_file, "rb") as f:
-            files = {"file": (os.path.basename(sample_pdf_file), f, "application/pdf")}
-            data = {"lender_name": "Timestamp Test", "created_by": "user"}
-            
-            response = await client.post(
-                "/api/lenders/upload",
-                files=files,
-                data=data
-            )
+        """Test that an LLM error marks the lender FAILED on the same session."""
+        files = {"file": (sample_pdf_filename, pdf_contents[sample_pdf_file], "application/pdf")}
+        response = await client.post(
+            "/api/lenders/upload",
+            files=files,
+            data={"lender_name": "Failing Lender"}
+        )
         
+        assert response.status_code == 201
         lender_id = response.json()["lender_id"]
         
-        result = await db_session.execute(
-            select(Lender).where(Lender.id == lender_id)
-        )
-        lender = result.scalar_one()
+        with patch(
+            "app.services.llm_service.LLMService.process_raw_text",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("LLM service unavailable")
+        ):
+            result = await _process_lender_document(lender_id)
         
-        assert lender.created_at is not None
-        assert lender.updated_at is not None
-        assert lender.created_at <= lender.updated_at
\ No newline at end of file
+        assert result["success"] is False
+        assert result["error"] == "LLM service unavailable"
+        
+        lender = await db_session.get(Lender, lender_id)
+        await db_session.refresh(lender, attribute_names=["status"])
+        assert lender.status == LenderStatus.FAILED
@@ -11,8 +11,9 @@ This module contains comprehensive tests for:
 """
 import pytest
 import json
+from unittest.mock import patch
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.loan_application import LoanApplication, LoanMatch, ApplicationStatus, MatchStatus
@@ -27,24 +28,24 @@ class TestLoanApplicationUpload:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test successful upload of a single loan application PDF"""
         
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'John Doe',
-                'applicant_email': 'john.doe@example.com',
-                'applicant_phone': '+1-555-0100',
-                'created_by': 'test_user'
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'John Doe',
+            'applicant_email': 'john.doe@example.com',
+            'applicant_phone': '+1-555-0100',
+            'created_by': 'test_user'
+        }
+        
+        response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         response_data = response.json()
@@ -58,10 +59,7 @@ class TestLoanApplicationUpload:
         # Verify database record
         application_id = response_data['application_id']
 
-        result = await db_session.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
+        application = await db_session.get(LoanApplication, application_id)
         
         assert application is not None
         assert application.applicant_name == 'John Doe'
@@ -72,13 +70,19 @@ class TestLoanApplicationUpload:
         assert len(application.raw_data) > 0
         # Processed data is populated by the async matching workflow, so it is None right after upload
         assert application.processed_data is None
+        
+        # Timestamps are set on insert
+        assert application.created_at is not None
+        assert application.updated_at is not None
+        assert application.created_at <= application.updated_at
     
     @pytest.mark.asyncio
     async def test_upload_with_application_details(
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test upload with additional application details"""
         
@@ -88,30 +92,26 @@ class TestLoanApplicationUpload:
             'purpose': 'Purchase primary residence'
         }
         
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Jane Smith',
-                'applicant_email': 'jane.smith@example.com',
-                'application_details': json.dumps(application_details),
-                'created_by': 'test_user'
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Jane Smith',
+            'applicant_email': 'jane.smith@example.com',
+            'application_details': json.dumps(application_details),
+            'created_by': 'test_user'
+        }
+        
+        response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         response_data = response.json()
         
         # Verify application details were stored
         application_id = response_data['application_id']
-        result = await db_session.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
+        application = await db_session.get(LoanApplication, application_id)
         
         assert application.application_details is not None
         assert application.application_details['loan_type'] == 'home'
@@ -165,22 +165,22 @@ class TestLoanApplicationUpload:
     async def test_upload_missing_applicant_name(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test upload without required applicant_name field"""
         
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_email': 'test@example.com'
-                # Missing applicant_name
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_email': 'test@example.com'
+            # Missing applicant_name
+        }
+        
+        response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 422  # Validation error
 
@@ -192,23 +192,23 @@ class TestLoanApplicationRetrieval:
     async def test_get_application_after_upload(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test retrieving a loan application after upload"""
         
         # First upload an application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Test Applicant',
-                'applicant_email': 'test@example.com'
-            }
-            
-            upload_response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Test Applicant',
+            'applicant_email': 'test@example.com'
+        }
+        
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         application_id = upload_response.json()['application_id']
         
@@ -230,26 +230,22 @@ class TestLoanApplicationRetrieval:
     async def test_list_applications_after_multiple_uploads(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        db_session: AsyncSession
     ):
         """Test listing applications after multiple uploads"""
         
-        # Upload multiple applications
+        # Insert the applications directly; the upload path is covered by the tests above
         applicants = ['Alice Johnson', 'Bob Williams', 'Carol Davis']
-        
-        for applicant in applicants:
-            with open(sample_pdf_file, 'rb') as f:
-                files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-                data = {
-                    'applicant_name': applicant,
-                    'applicant_email': f'{applicant.lower().replace(" ", ".")}@example.com'
-                }
-                
-                await client.post(
-                    '/api/loan-applications/upload',
-                    files=files,
-                    data=data
-                )
+        db_session.add_all([
+            LoanApplication(
+                applicant_name=applicant,
+                applicant_email=f'{applicant.lower().replace(" ", ".")}@example.com',
+                raw_data="Loan application text",
+                status=ApplicationStatus.UPLOADED
+            )
+            for applicant in applicants
+        ])
+        await db_session.commit()
         
         # List all applications
         response = await client.get('/api/loan-applications/')
@@ -259,30 +255,30 @@ class TestLoanApplicationRetrieval:
         
         assert 'total' in data
         assert 'applications' in data
-        assert data['total'] >= 3
-        assert len(data['applications']) >= 3
+        assert data['total'] == len(applicants)
+        assert {app['applicant_name'] for app in data['applications']} == set(applicants)
     
     @pytest.mark.asyncio
     async def test_filter_applications_by_status(
         self,
         client: AsyncClient,
-        sample_pdf_file: str
+        sample_pdf_file: str,
+        pdf_contents: dict[str, bytes]
     ):
         """Test filtering applications by status"""
         
         # Upload an application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Status Test User',
-                'applicant_email': 'status@example.com'
-            }
-            
-            await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Status Test User',
+            'applicant_email': 'status@example.com'
+        }
+        
+        await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         # Filter by uploaded status
         response = await client.get('/api/loan-applications/?status_filter=uploaded')
@@ -294,6 +290,164 @@ class TestLoanApplicationRetrieval:
         for app in data['applications']:
             assert app['status'] == 'uploaded'
     
+    @pytest.mark.asyncio
+    async def test_list_applications_conditional_get(
+        self,
+        client: AsyncClient,
+        sample_pdf_file: str,
+        pdf_contents: dict[str, bytes]
+    ):
+        """Test that an unchanged list is revalidated with 304 Not Modified"""
+        
+        response = await client.get('/api/loan-applications/')
+        etag = response.headers['etag']
+        
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == 'no-cache'
+        
+        # Unchanged list
+        response = await client.get('/api/loan-applications/', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.content == b''
+        
+        # Upload changes the list, so the old ETag no longer matches
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data={'applicant_name': 'ETag Test'}
+        )
+        
+        response = await client.get('/api/loan-applications/', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['etag'] != etag
+        assert response.json()['total'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_conditional_get_if_none_match_list(self, client: AsyncClient):
+        """Test that If-None-Match lists, weak tags and "*" are honoured, with CORS headers on the 304"""
+        
+        response = await client.get('/api/loan-applications/')
+        etag = response.headers['etag']
+        
+        for if_none_match in [f'"stale", {etag}', f'W/{etag}', '*']:
+            response = await client.get(
+                '/api/loan-applications/',
+                headers={'If-None-Match': if_none_match, 'Origin': 'http://localhost:5173'}
+            )
+            
+            assert response.status_code == 304
+            assert response.headers['access-control-allow-origin'] == 'http://localhost:5173'
+        
+        # A tag that merely contains the ETag is not a match
+        response = await client.get('/api/loan-applications/', headers={'If-None-Match': f'"x{etag[1:]}'})
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_get_application_status(
+        self,
+        client: AsyncClient,
+        sample_pdf_file: str,
+        pdf_contents: dict[str, bytes]
+    ):
+        """Test retrieving only the status of an application"""
+        
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data={'applicant_name': 'Status Test'}
+        )
+        
+        application_id = upload_response.json()['application_id']
+        
+        response = await client.get(f'/api/loan-applications/{application_id}/status')
+        
+        assert response.status_code == 200
+        response_data = response.json()
+        assert response_data['application_id'] == application_id
+        assert response_data['status'] == 'uploaded'
+        assert set(response_data) == {'application_id', 'status', 'updated_at'}
+        
+        response = await client.get('/api/loan-applications/99999/status')
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_stream_application_status(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession
+    ):
+        """Test that the status event stream reports a finished application and ends"""
+        
+        application = LoanApplication(
+            applicant_name="Stream Test",
+            raw_data="Loan application text",
+            status=ApplicationStatus.COMPLETED
+        )
+        db_session.add(application)
+        await db_session.commit()
+        
+        response = await client.get(f'/api/loan-applications/{application.id}/events')
+        
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = [
+            json.loads(line[len('data: '):])
+            for line in response.text.splitlines()
+            if line.startswith('data: ')
+        ]
+        assert len(events) == 1
+        assert events[0]['application_id'] == application.id
+        assert events[0]['status'] == 'completed'
+        
+        response = await client.get('/api/loan-applications/99999/events')
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_stream_application_status_backs_off(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession
+    ):
+        """Test that the stream re-reads with a growing delay that resets on a status change"""
+        
+        application = LoanApplication(
+            applicant_name="Backoff Test",
+            raw_data="Loan application text",
+            status=ApplicationStatus.UPLOADED
+        )
+        db_session.add(application)
+        await db_session.commit()
+        
+        # Advance the status from inside the stream's sleeps instead of waiting
+        delays = []
+        transitions = {3: ApplicationStatus.PROCESSING, 5: ApplicationStatus.COMPLETED}
+        
+        async def fake_sleep(delay):
+            delays.append(delay)
+            if len(delays) in transitions:
+                await db_session.execute(
+                    update(LoanApplication)
+                    .where(LoanApplication.id == application.id)
+                    .values(status=transitions[len(delays)])
+                )
+                await db_session.commit()
+        
+        with patch('app.routers.loan_application_routes.asyncio.sleep', side_effect=fake_sleep):
+            response = await client.get(f'/api/loan-applications/{application.id}/events')
+        
+        statuses = [
+            json.loads(line[len('data: '):])['status']
+            for line in response.text.splitlines()
+            if line.startswith('data: ')
+        ]
+        assert statuses == ['uploaded', 'processing', 'completed']
+        assert delays == [2, 3, 4.5, 2, 3]
+    
     @pytest.mark.asyncio
     async def test_get_nonexistent_application(
         self,
@@ -314,7 +468,8 @@ class TestMatchingWorkflow:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test that uploading an application triggers matching workflow"""
         
@@ -338,25 +493,21 @@ class TestMatchingWorkflow:
             }
         ]
         
-        for lender_data in lenders_data:
-            lender = Lender(**lender_data)
-            db_session.add(lender)
-        
+        db_session.add_all([Lender(**lender_data) for lender_data in lenders_data])
         await db_session.commit()
         
         # Upload application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Match Test User',
-                'applicant_email': 'match@example.com'
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Match Test User',
+            'applicant_email': 'match@example.com'
+        }
+        
+        response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         assert response.status_code == 201
         response_data = response.json()
@@ -369,7 +520,8 @@ class TestMatchingWorkflow:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test retrieving matches for an application"""
         
@@ -381,21 +533,19 @@ class TestMatchingWorkflow:
         )
         db_session.add(lender)
         await db_session.commit()
-        await db_session.refresh(lender)
         
         # Upload application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Match Retrieval Test',
-                'applicant_email': 'matchtest@example.com'
-            }
-            
-            upload_response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Match Retrieval Test',
+            'applicant_email': 'matchtest@example.com'
+        }
+        
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         application_id = upload_response.json()['application_id']
         
@@ -420,6 +570,55 @@ class TestMatchingWorkflow:
         assert matches[0]['lender_id'] == lender.id
         assert matches[0]['match_score'] == 85.5
         assert matches[0]['status'] == 'completed'
+    
+    @pytest.mark.asyncio
+    async def test_get_application_with_match_lender_names(
+        self,
+        client: AsyncClient,
+        sample_pdf_file: str,
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
+    ):
+        """Test that application details include each match's lender name"""
+        
+        # Create lenders
+        lenders = [
+            Lender(lender_name=name, status=LenderStatus.COMPLETED)
+            for name in ('Bank A', 'Bank B')
+        ]
+        db_session.add_all(lenders)
+        await db_session.commit()
+        lender_names = {lender.id: lender.lender_name for lender in lenders}
+        
+        # Upload application
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data={'applicant_name': 'Lender Name Test'}
+        )
+        
+        application_id = upload_response.json()['application_id']
+        
+        # Create matches manually for testing
+        db_session.add_all([
+            LoanMatch(
+                loan_application_id=application_id,
+                lender_id=lender_id,
+                match_score=70.0,
+                status=MatchStatus.COMPLETED
+            )
+            for lender_id in lender_names
+        ])
+        await db_session.commit()
+        
+        # Get application with matches
+        response = await client.get(f'/api/loan-applications/{application_id}')
+        
+        assert response.status_code == 200
+        matches = response.json()['matches']
+        
+        assert {match['lender_id']: match['lender_name'] for match in matches} == lender_names
 
 
 class TestMatchScoreCalculation:
@@ -430,7 +629,8 @@ class TestMatchScoreCalculation:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test that match scores have the correct structure"""
         
@@ -446,21 +646,19 @@ class TestMatchScoreCalculation:
         )
         db_session.add(lender)
         await db_session.commit()
-        await db_session.refresh(lender)
         
         # Upload application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Score Test User',
-                'applicant_email': 'scoretest@example.com'
-            }
-            
-            upload_response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Score Test User',
+            'applicant_email': 'scoretest@example.com'
+        }
+        
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         application_id = upload_response.json()['application_id']
         
@@ -522,7 +720,8 @@ class TestParallelProcessing:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test that application is matched against multiple lenders"""
         
@@ -534,8 +733,8 @@ class TestParallelProcessing:
             {'name': 'Bank Delta', 'loan_types': ['personal', 'education']},
         ]
         
-        for lender_data in lenders_data:
-            lender = Lender(
+        db_session.add_all([
+            Lender(
                 lender_name=lender_data['name'],
                 status=LenderStatus.COMPLETED,
                 processed_data={
@@ -543,23 +742,22 @@ class TestParallelProcessing:
                     'interest_rates': {'min': '3.5%', 'max': '6.0%'}
                 }
             )
-            db_session.add(lender)
-        
+            for lender_data in lenders_data
+        ])
         await db_session.commit()
         
         # Upload application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Parallel Test User',
-                'applicant_email': 'parallel@example.com'
-            }
-            
-            upload_response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Parallel Test User',
+            'applicant_email': 'parallel@example.com'
+        }
+        
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         assert upload_response.status_code == 201
         
@@ -567,75 +765,6 @@ class TestParallelProcessing:
         # For this test, we're verifying the upload succeeds and workflow is triggered
 
 
-class TestDataValidation:
-    """Test cases for data validation"""
-    
-    @pytest.mark.asyncio
-    async def test_processed_data_extraction(
-        self,
-        client: AsyncClient,
-        sample_pdf_file: str,
-        db_session: AsyncSession
-    ):
-        """Test that processed data is extracted correctly"""
-        
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Data Test User',
-                'applicant_email': 'datatest@example.com'
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
-        
-        application_id = response.json()['application_id']
-        
-        # Retrieve application
-        result = await db_session.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
-    
-    @pytest.mark.asyncio
-    async def test_timestamp_fields(
-        self,
-        client: AsyncClient,
-        sample_pdf_file: str,
-        db_session: AsyncSession
-    ):
-        """Test that timestamp fields are set correctly"""
-        
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Timestamp Test User',
-                'applicant_email': 'timestamp@example.com'
-            }
-            
-            response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
-        
-        application_id = response.json()['application_id']
-        
-        # Retrieve application
-        result = await db_session.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
-        
-        # Verify timestamps
-        assert application.created_at is not None
-        assert application.updated_at is not None
-        assert application.created_at <= application.updated_at
-
-
 class TestErrorHandling:
     """Test cases for error handling"""
     
@@ -644,7 +773,8 @@ class TestErrorHandling:
         self,
         client: AsyncClient,
         sample_pdf_file: str,
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        pdf_contents: dict[str, bytes]
     ):
         """Test that match failures are handled gracefully"""
         
@@ -656,21 +786,19 @@ class TestErrorHandling:
         )
         db_session.add(lender)
         await db_session.commit()
-        await db_session.refresh(lender)
         
         # Upload application
-        with open(sample_pdf_file, 'rb') as f:
-            files = {'file': ('loan_app.pdf', f, 'application/pdf')}
-            data = {
-                'applicant_name': 'Error Test User',
-                'applicant_email': 'errortest@example.com'
-            }
-            
-            upload_response = await client.post(
-                '/api/loan-applications/upload',
-                files=files,
-                data=data
-            )
+        files = {'file': ('loan_app.pdf', pdf_contents[sample_pdf_file], 'application/pdf')}
+        data = {
+            'applicant_name': 'Error Test User',
+            'applicant_email': 'errortest@example.com'
+        }
+        
+        upload_response = await client.post(
+            '/api/loan-applications/upload',
+            files=files,
+            data=data
+        )
         
         application_id = upload_response.json()['application_id']
         
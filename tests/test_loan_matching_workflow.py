@@ -0,0 +1,387 @@
+"""
+Test Cases for Loan Matching Workflow
+
+This module tests the module-level helpers behind the Hatchet loan matching
+workflow steps. The Hatchet tasks themselves are only registered when a
+Hatchet client is configured, so the helpers are called directly against the
+test database.
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lender import Lender, LenderStatus
+from app.models.loan_application import LoanApplication, LoanMatch, MatchStatus
+from app.services.lender_cache import active_lender_cache
+from app.workflows.loan_matching_workflow import (
+    _calculate_match_batch,
+    _calculate_matches,
+    _create_match_records,
+    _get_all_active_lenders,
+    _save_match_results,
+)
+
+
+@pytest.fixture
+async def application(db_session: AsyncSession) -> LoanApplication:
+    """Create a loan application with processed data."""
+    application = LoanApplication(
+        applicant_name="Workflow Applicant",
+        raw_data="Loan application text",
+        processed_data={"loan_type": "home", "loan_amount": {"amount": 450000}}
+    )
+    db_session.add(application)
+    await db_session.commit()
+    return application
+
+
+@pytest.fixture
+async def lenders(db_session: AsyncSession) -> list[Lender]:
+    """Create completed lenders with processed data."""
+    lenders = [
+        Lender(
+            lender_name=f"Workflow Bank {idx + 1}",
+            status=LenderStatus.COMPLETED,
+            processed_data={"loan_types": ["home"]}
+        )
+        for idx in range(3)
+    ]
+    db_session.add_all(lenders)
+    await db_session.commit()
+    return lenders
+
+
+class TestPrepareMatching:
+    """Test suite for creating match records."""
+
+    @pytest.mark.asyncio
+    async def test_get_all_active_lenders(
+        self,
+        db_session: AsyncSession,
+        lenders: list[Lender]
+    ):
+        """Test that only completed lenders are loaded, in streamed chunks."""
+        db_session.add(Lender(lender_name="Processing Bank", status=LenderStatus.PROCESSING))
+        await db_session.commit()
+
+        with patch("app.workflows.loan_matching_workflow.LENDER_FETCH_CHUNK_SIZE", 2):
+            active_lenders = await _get_all_active_lenders(db_session)
+
+        assert sorted(lender["id"] for lender in active_lenders) == [lender.id for lender in lenders]
+        assert all(lender["processed_data"] == {"loan_types": ["home"]} for lender in active_lenders)
+
+    @pytest.mark.asyncio
+    async def test_create_match_records(
+        self,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that one processing match is created per lender."""
+        lender_ids = [lender.id for lender in lenders]
+
+        await _create_match_records(db_session, application.id, lender_ids)
+        await db_session.commit()
+
+        result = await db_session.execute(
+            select(LoanMatch).where(LoanMatch.loan_application_id == application.id)
+        )
+        matches = result.scalars().all()
+
+        assert sorted(match.lender_id for match in matches) == lender_ids
+        assert all(match.status == MatchStatus.PROCESSING for match in matches)
+
+    @pytest.mark.asyncio
+    async def test_create_match_records_is_idempotent(
+        self,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that a retried step skips lenders that already have a match."""
+        lender_ids = [lender.id for lender in lenders]
+
+        await _create_match_records(db_session, application.id, lender_ids[:1])
+        await db_session.commit()
+        await _create_match_records(db_session, application.id, lender_ids)
+        await db_session.commit()
+
+        result = await db_session.execute(
+            select(LoanMatch.lender_id).where(LoanMatch.loan_application_id == application.id)
+        )
+
+        assert sorted(result.scalars().all()) == lender_ids
+
+    @pytest.mark.asyncio
+    async def test_create_match_records_skips_stale_lenders(
+        self,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that cached ids of deleted or inactive lenders get no match record."""
+        lender_ids = [lender.id for lender in lenders]
+        await db_session.delete(lenders[0])
+        lenders[1].status = LenderStatus.PROCESSING
+        await db_session.commit()
+
+        created_ids = await _create_match_records(db_session, application.id, lender_ids)
+        await db_session.commit()
+
+        result = await db_session.execute(
+            select(LoanMatch.lender_id).where(LoanMatch.loan_application_id == application.id)
+        )
+
+        assert created_ids == lender_ids[2:]
+        assert result.scalars().all() == lender_ids[2:]
+
+
+class TestCalculateMatches:
+    """Test suite for match score calculation."""
+
+    @pytest.mark.asyncio
+    async def test_calculate_match_batch(
+        self,
+        mock_services,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that a batch of matches is scored from a single batched LLM reply."""
+        lender_ids = [lender.id for lender in lenders]
+        await _create_match_records(db_session, application.id, lender_ids)
+        await db_session.commit()
+        # The batched reply scores every lender, so no individual request is made
+        content = json.dumps({
+            "matches": [
+                {"lender_id": lender_id, "match_score": 77, "match_category": "good"}
+                for lender_id in lender_ids
+            ]
+        })
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=1200)
+        ))
+
+        with patch("app.workflows.loan_matching_workflow.match_service.client", client):
+            results = await _calculate_match_batch(db_session, application.id, application.processed_data, lender_ids)
+
+        assert client.chat.completions.create.call_count == 1
+        mock_services.match_calculate_score.assert_not_called()
+        assert sorted(result["lender_id"] for result in results) == lender_ids
+        for result in results:
+            assert result["success"] is True
+            assert result["application_id"] == application.id
+            assert result["match_score"] == 77
+            assert result["match_analysis"]["match_category"] == "good"
+            assert result["match_analysis"]["_metadata"]["batch_size"] == len(lender_ids)
+
+    @pytest.mark.asyncio
+    async def test_calculate_match_batch_without_record(
+        self,
+        mock_services,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that a missing match record is reported as a failure."""
+        results = await _calculate_match_batch(db_session, application.id, application.processed_data, [lenders[0].id])
+
+        assert len(results) == 1
+        assert results[0]["success"] is False
+        assert "not found" in results[0]["error"]
+
+    @pytest.mark.asyncio
+    async def test_calculate_match_batch_uses_cached_lender_data(
+        self,
+        mock_services,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that lender data comes from the cache, with the database as fallback."""
+        lender_ids = [lender.id for lender in lenders]
+        await _create_match_records(db_session, application.id, lender_ids)
+        await db_session.commit()
+        # Only the first lender is cached, with data that differs from the database
+        await active_lender_cache.get(
+            AsyncMock(return_value=[{"id": lender_ids[0], "processed_data": {"loan_types": ["cached"]}}])
+        )
+
+        with patch(
+            "app.workflows.loan_matching_workflow.match_service.calculate_match_scores_batch",
+            new_callable=AsyncMock,
+            return_value=[]
+        ) as mock_batch:
+            await _calculate_match_batch(db_session, application.id, application.processed_data, lender_ids)
+
+        assert mock_batch.call_args.kwargs["application_data"] == application.processed_data
+        data_by_lender = {lender["id"]: lender["data"] for lender in mock_batch.call_args.kwargs["lenders"]}
+        assert data_by_lender == {
+            lender_ids[0]: {"loan_types": ["cached"]},
+            lender_ids[1]: {"loan_types": ["home"]},
+            lender_ids[2]: {"loan_types": ["home"]},
+        }
+
+    @pytest.mark.asyncio
+    async def test_calculate_matches_saves_results(
+        self,
+        mock_services,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that every lender is scored once and all outcomes are saved."""
+        application_id = application.id
+        lender_ids = [lender.id for lender in lenders]
+        # The last lender has no match record, so its calculation fails
+        await _create_match_records(db_session, application_id, lender_ids[:-1])
+        await db_session.commit()
+
+        # One lender per batch so each result is saved by its own commit
+        with patch("app.workflows.loan_matching_workflow.MATCH_BATCH_SIZE", 1), \
+             patch("app.workflows.loan_matching_workflow.MATCH_CONCURRENCY", 1):
+            results = await _calculate_matches(application_id, lender_ids)
+
+        assert sorted(result["lender_id"] for result in results) == lender_ids
+        assert sum(result["success"] for result in results) == len(lender_ids) - 1
+        assert all(set(result) <= {"lender_id", "success", "match_score", "error"} for result in results)
+
+        db_session.expire_all()
+        matches = (await db_session.execute(
+            select(LoanMatch)
+            .where(LoanMatch.loan_application_id == application_id)
+            .order_by(LoanMatch.lender_id)
+        )).scalars().all()
+
+        assert [match.lender_id for match in matches] == lender_ids[:-1]
+        for match in matches:
+            assert match.status == MatchStatus.COMPLETED
+            assert match.match_score == 82.5
+            assert match.match_analysis["match_category"] == "very_good"
+            assert match.error_message is None
+
+    @pytest.mark.asyncio
+    async def test_calculate_matches_contains_save_failures(
+        self,
+        mock_services,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that a batch whose save fails is marked FAILED while the other batches complete."""
+        application_id = application.id
+        lender_ids = [lender.id for lender in lenders]
+        await _create_match_records(db_session, application_id, lender_ids)
+        await db_session.commit()
+
+        # Only the first save fails; marking the batch FAILED goes through the real helper
+        save_calls = 0
+
+        async def flaky_save(db, application_id, results):
+            nonlocal save_calls
+            save_calls += 1
+            if save_calls == 1:
+                raise RuntimeError("database unavailable")
+            await _save_match_results(db, application_id, results)
+
+        with patch("app.workflows.loan_matching_workflow.MATCH_BATCH_SIZE", 1), \
+             patch("app.workflows.loan_matching_workflow.MATCH_CONCURRENCY", 1), \
+             patch("app.workflows.loan_matching_workflow._save_match_results", side_effect=flaky_save):
+            results = await _calculate_matches(application_id, lender_ids)
+
+        assert sorted(result["lender_id"] for result in results) == lender_ids
+        assert sum(result["success"] for result in results) == len(lender_ids) - 1
+
+        db_session.expire_all()
+        matches = (await db_session.execute(
+            select(LoanMatch)
+            .where(LoanMatch.loan_application_id == application_id)
+            .order_by(LoanMatch.lender_id)
+        )).scalars().all()
+
+        assert [match.status for match in matches] == [
+            MatchStatus.FAILED, MatchStatus.COMPLETED, MatchStatus.COMPLETED
+        ]
+        assert matches[0].error_message == "database unavailable"
+
+    @pytest.mark.asyncio
+    async def test_calculate_matches_runs_batches_concurrently(self):
+        """Test that concurrent workers on their own sessions process every batch exactly once."""
+        lender_ids = list(range(1, 8))
+        sessions = []
+        scored = []
+        saved = []
+
+        @asynccontextmanager
+        async def stub_session():
+            session = AsyncMock(spec=AsyncSession)
+            session.scalar.return_value = {"loan_type": "home"}
+            sessions.append(session)
+            yield session
+
+        async def score_batch(db, application_id, application_data, batch):
+            # Yield so the other workers pull their batches before this one finishes
+            await asyncio.sleep(0)
+            scored.append((db, tuple(batch)))
+            return [
+                {"lender_id": lender_id, "success": True, "application_id": application_id, "match_score": 80.0}
+                for lender_id in batch
+            ]
+
+        async def save_results(db, application_id, results):
+            saved.append(tuple(result["lender_id"] for result in results))
+
+        with patch("app.workflows.loan_matching_workflow.MATCH_BATCH_SIZE", 2), \
+             patch("app.workflows.loan_matching_workflow.MATCH_CONCURRENCY", 3), \
+             patch("app.workflows.loan_matching_workflow.WorkflowAsyncSession", stub_session), \
+             patch("app.workflows.loan_matching_workflow._calculate_match_batch", side_effect=score_batch), \
+             patch("app.workflows.loan_matching_workflow._save_match_results", side_effect=save_results):
+            results = await _calculate_matches(1, lender_ids)
+
+        batches = [(1, 2), (3, 4), (5, 6), (7,)]
+        assert sorted(batch for _, batch in scored) == batches
+        assert sorted(saved) == batches
+        assert sorted(result["lender_id"] for result in results) == lender_ids
+
+        # One session loads the application, then each of the three workers uses its own
+        worker_sessions = sessions[1:]
+        assert len(worker_sessions) == 3
+        assert {id(db) for db, _ in scored} == {id(session) for session in worker_sessions}
+        for session in worker_sessions:
+            assert session.commit.await_count == sum(db is session for db, _ in scored)
+
+    @pytest.mark.asyncio
+    async def test_save_match_results_records_failures(
+        self,
+        db_session: AsyncSession,
+        application: LoanApplication,
+        lenders: list[Lender]
+    ):
+        """Test that failed matches are saved with their error message."""
+        application_id = application.id
+        lender_id = lenders[0].id
+        await _create_match_records(db_session, application_id, [lender_id])
+        await db_session.commit()
+
+        await _save_match_results(
+            db_session,
+            application_id,
+            [{"lender_id": lender_id, "success": False, "error": "LLM service unavailable"}]
+        )
+        await db_session.commit()
+
+        db_session.expire_all()
+        match = (await db_session.execute(
+            select(LoanMatch).where(LoanMatch.loan_application_id == application_id)
+        )).scalar_one()
+
+        assert match.status == MatchStatus.FAILED
+        assert match.match_score is None
+        assert match.error_message == "LLM service unavailable"
@@ -0,0 +1,115 @@
+"""
+Test Cases for Match Service
+
+This module tests batched match scoring. The OpenAI client is replaced with a
+mock so no requests leave the test process.
+"""
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+import pytest
+
+from app.services.match_service import MatchService
+
+
+def _completion(content: dict) -> SimpleNamespace:
+    """Build a minimal chat completion response carrying content as JSON."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))],
+        usage=SimpleNamespace(total_tokens=1200)
+    )
+
+
+class TestBatchMatchScoring:
+    """Test suite for scoring several lenders in one request."""
+
+    @pytest.mark.asyncio
+    async def test_batch_scores_and_falls_back_for_missing_lenders(self):
+        """Test that lenders missing from the batched reply are scored individually."""
+        service = MatchService()
+        service.client = MagicMock()
+        service.client.chat.completions.create = AsyncMock(return_value=_completion({
+            "matches": [{"lender_id": 1, "match_score": 91, "match_category": "excellent"}]
+        }))
+        lenders = [
+            {"id": 1, "name": "Bank A", "data": {"loan_types": ["home"]}},
+            {"id": 2, "name": "Bank B", "data": {"loan_types": ["auto"]}},
+        ]
+
+        with patch.object(
+            service,
+            "calculate_match_score",
+            new_callable=AsyncMock,
+            return_value={"match_score": 40, "match_analysis": {"match_category": "fair"}}
+        ) as mock_single:
+            results = await service.calculate_match_scores_batch({"loan_type": "home"}, lenders, application_id=7)
+
+        assert service.client.chat.completions.create.call_count == 1
+        assert mock_single.call_count == 1
+        assert mock_single.call_args.kwargs["lender_id"] == 2
+
+        by_lender = {result["lender_id"]: result for result in results}
+        assert by_lender[1]["match_score"] == 91
+        assert by_lender[1]["match_analysis"]["_metadata"]["batch_size"] == 2
+        assert by_lender[2]["match_score"] == 40
+        assert all(result["success"] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_loan_type_prefilter_skips_llm(self):
+        """Test that lenders without the requested loan type are scored without the LLM."""
+        service = MatchService(prefilter_loan_type=True)
+        lenders = [
+            {"id": 1, "name": "Bank A", "data": {"loan_types": ["Home Loan", "Personal"]}},
+            {"id": 2, "name": "Bank B", "data": {"loan_types": ["auto"]}},
+            {"id": 3, "name": "Bank C", "data": {"loan_types": None}},
+        ]
+
+        with patch.object(
+            service,
+            "calculate_match_score",
+            new_callable=AsyncMock,
+            return_value={"match_score": 70, "match_analysis": {"match_category": "good"}}
+        ) as mock_fallback:
+            results = await service.calculate_match_scores_batch({"loan_type": "home"}, lenders, application_id=7)
+
+        assert sorted(call.kwargs["lender_id"] for call in mock_fallback.call_args_list) == [1, 3]
+
+        by_lender = {result["lender_id"]: result for result in results}
+        assert by_lender[2]["match_score"] == 0
+        assert by_lender[2]["match_analysis"]["_metadata"]["prefiltered"] is True
+        assert by_lender[1]["match_score"] == by_lender[3]["match_score"] == 70
+
+    @pytest.mark.asyncio
+    async def test_parse_failure_falls_back_for_every_unscored_lender(self):
+        """Test that an error part-way through the reply still gives every lender a result."""
+        service = MatchService()
+        service.client = MagicMock()
+        response = _completion({
+            "matches": [
+                {"lender_id": lender_id, "match_score": 91, "match_category": "excellent"}
+                for lender_id in (1, 2, 3)
+            ]
+        })
+        # Token usage can be read for the first lender only, so the reply fails mid-loop
+        response.usage = MagicMock()
+        type(response.usage).total_tokens = PropertyMock(side_effect=[1200, RuntimeError("usage unavailable")])
+        service.client.chat.completions.create = AsyncMock(return_value=response)
+        lenders = [
+            {"id": lender_id, "name": f"Bank {lender_id}", "data": {"loan_types": ["home"]}}
+            for lender_id in (1, 2, 3)
+        ]
+
+        with patch.object(
+            service,
+            "calculate_match_score",
+            new_callable=AsyncMock,
+            return_value={"match_score": 40, "match_analysis": {"match_category": "fair"}}
+        ) as mock_single:
+            results = await service.calculate_match_scores_batch({"loan_type": "home"}, lenders, application_id=7)
+
+        assert sorted(call.kwargs["lender_id"] for call in mock_single.call_args_list) == [2, 3]
+
+        by_lender = {result["lender_id"]: result for result in results}
+        assert sorted(by_lender) == [1, 2, 3]
+        assert by_lender[1]["match_score"] == 91
+        assert by_lender[2]["match_score"] == by_lender[3]["match_score"] == 40
@@ -0,0 +1,113 @@
+"""
+Test Cases for OCR Service
+
+This module tests text extraction from PDFs. Tesseract is patched out so the
+tests only exercise the native text layer path and the OCR fallback routing.
+"""
+from unittest.mock import patch
+import fitz  # PyMuPDF
+import pytest
+
+from app.services.ocr_postprocess import clean_ocr_text
+from app.services.ocr_service import OCRService
+
+
+def _build_pdf(page_texts: list[str]) -> bytes:
+    """Build an in-memory PDF with one page per entry in page_texts."""
+    document = fitz.open()
+    for text in page_texts:
+        page = document.new_page()
+        if text:
+            page.insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=9)
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+class TestNativeTextLayer:
+    """Test suite for skipping OCR on born-digital PDFs."""
+
+    @pytest.mark.asyncio
+    async def test_native_text_skips_ocr(self, sample_pdf_file: str, pdf_contents: dict[str, bytes]):
+        """Test that a PDF with a text layer never invokes Tesseract."""
+        pdf_bytes = pdf_contents[sample_pdf_file]
+
+        with patch("app.services.ocr_service.pytesseract.image_to_string") as mock_ocr:
+            text = await OCRService().extract_text_from_pdf(pdf_bytes)
+
+        mock_ocr.assert_not_called()
+        assert text.startswith("--- Page 1 ---")
+        assert len(text) > 200
+
+    @pytest.mark.asyncio
+    async def test_empty_pages_fall_back_to_ocr(self):
+        """Test that only pages without native text are OCR'd."""
+        body = "Plan 1O0: Minimum Loan $50,000. Maximum Loan $5,000,000. " * 10
+        pdf_bytes = _build_pdf([body, "", body])
+
+        with patch(
+            "app.services.ocr_service.pytesseract.image_to_string",
+            return_value="Scanned page 1O0"
+        ) as mock_ocr:
+            text = await OCRService().extract_text_from_pdf(pdf_bytes, dpi=72)
+
+        assert mock_ocr.call_count == 1
+        assert mock_ocr.call_args.args[0].mode == "L"
+        # Only OCR output is cleaned; the native text layer is kept verbatim
+        assert "--- Page 2 ---\nScanned page 100" in text
+        assert "Plan 1O0" in text
+        assert "--- Page 3 ---" in text
+
+    @pytest.mark.asyncio
+    async def test_sparse_text_layer_uses_ocr(self):
+        """Test that a PDF below the native text threshold is OCR'd."""
+        pdf_bytes = _build_pdf(["Page header", "Page header"])
+
+        with patch(
+            "app.services.ocr_service.pytesseract.image_to_string",
+            return_value="Scanned page"
+        ) as mock_ocr:
+            text = await OCRService().extract_text_from_pdf(pdf_bytes, dpi=72)
+
+        assert mock_ocr.call_count == 2
+        assert "Page header" not in text
+
+
+class TestImageOCR:
+    """Test suite for OCR on standalone images."""
+
+    @pytest.mark.asyncio
+    async def test_extract_text_from_image(self):
+        """Test that image bytes are decoded in memory and passed to Tesseract."""
+        image_bytes = fitz.open().new_page().get_pixmap().tobytes("png")
+
+        with patch(
+            "app.services.ocr_service.pytesseract.image_to_string",
+            return_value="Scanned image"
+        ) as mock_ocr:
+            text = await OCRService().extract_text_from_image(image_bytes)
+
+        assert text == "Scanned image"
+        assert mock_ocr.call_args.args[0].size == (595, 842)
+
+
+class TestPostProcessing:
+    """Test suite for OCR text clean-up."""
+
+    def test_clean_ocr_text(self):
+        """Test that each fix-up rule is applied in a single pass."""
+        raw = "Loan: $5,0O0 at 1O%\nfor application fees\n\n\n\nEnd"
+
+        assert clean_ocr_text(raw) == "Loan: $5,000 at 10%\nfor application fees\n\nEnd"
+
+    def test_clean_ocr_text_preserves_words(self):
+        """Test that letters outside numbers and page markers are untouched."""
+        raw = "--- Page 1 ---\nOO Bank offers 0 fees\n\n--- Page 2 ---\nOK"
+
+        assert clean_ocr_text(raw) == raw
+
+    def test_clean_ocr_text_preserves_compounds_and_columns(self):
+        """Test that line-break hyphens and table column spacing are kept."""
+        raw = "Borrower is self-\nemployed\nTerm      Rate     Fee\n5 years   6.5%     $500"
+
+        assert clean_ocr_text(raw) == raw